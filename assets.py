@@ -0,0 +1,179 @@
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from event_log import event_log
+
+
+ASSET_DIR = os.path.join(os.path.dirname(__file__), "assets")
+CACHE_DIR = os.path.join(os.path.dirname(__file__), ".asset_cache")
+
+
+# -----------------------------------------------------------
+# FUNCTION: make_placeholder
+# Checkerboard drawn in place of an image that can't be loaded.
+# -----------------------------------------------------------
+def make_placeholder(size, square=32):
+    width, height = size
+    surface = pygame.Surface((width, height))
+    surface.fill((20, 10, 30))
+    for y in range(0, height, square):
+        for x in range((y // square) % 2 * square, width, square * 2):
+            surface.fill((60, 20, 80), (x, y, square, square))
+    return surface
+
+
+# -----------------------------------------------------------
+# CLASS: AssetManager
+# Loads images from assets/ once, scaled to the size asked for
+# and converted to the display's pixel format (convert() or,
+# with alpha=True, convert_alpha()), so blits never pay for a
+# format conversion.
+#
+# Scaled variants are also cached on disk (cache_dir) as raw
+# RGBA, keyed by the source's mtime and size and the target
+# size, so the next start skips decoding and smoothscaling.
+#
+# preload() decodes and scales on a worker thread; the display
+# conversion happens on the calling thread the first time the
+# image is asked for. A missing or broken file gives a
+# placeholder instead of an exception.
+#
+#   assets.preload([("Backgrounds/background.png", (1280, 720))])
+#   background = assets.image("Backgrounds/background.png", (1280, 720), wait=False)
+#   if background is None: ...  # still loading
+# -----------------------------------------------------------
+class AssetManager:
+    def __init__(self, asset_dir=ASSET_DIR, cache_dir=CACHE_DIR):
+        self.asset_dir = asset_dir
+        self.cache_dir = cache_dir
+        self.images = {}  # (name, size, alpha) -> converted surface
+        self.pending = {}  # (name, size) -> Future of an unconverted surface
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def path(self, name):
+        # Resolves a name like "Buttons/startButton.png" inside asset_dir
+        path = os.path.normpath(os.path.join(self.asset_dir, name))
+        if os.path.commonpath([path, os.path.normpath(self.asset_dir)]) != os.path.normpath(self.asset_dir):
+            raise ValueError(f"asset path escapes {self.asset_dir}: {name}")
+        return path
+
+    # -----------------------------------------------------------
+    # LOOKUP
+    # -----------------------------------------------------------
+    def image(self, name, size=None, alpha=False, wait=True):
+        key = (name, tuple(size) if size else None, alpha)
+        surface = self.images.get(key)
+        if surface is not None:
+            return surface
+
+        with self.lock:
+            future = self.pending.get(key[:2])
+        if future is not None:
+            if not wait and not future.done():
+                return None
+            raw = future.result()
+            with self.lock:
+                self.pending.pop(key[:2], None)
+        else:
+            raw = self._load(name, key[1])
+
+        surface = self._convert(raw, alpha)
+        self.images[key] = surface
+        return surface
+
+    def ready(self, name, size=None):
+        with self.lock:
+            future = self.pending.get((name, tuple(size) if size else None))
+        return future is None or future.done()
+
+    def preload(self, requests):
+        # requests: iterable of (name, size or None)
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="asset-preload")
+        with self.lock:
+            for name, size in requests:
+                key = (name, tuple(size) if size else None)
+                if key not in self.pending:
+                    self.pending[key] = self.executor.submit(self._load, *key)
+
+    def clear(self):
+        self.images.clear()
+        with self.lock:
+            self.pending.clear()
+
+    def _convert(self, surface, alpha):
+        # Display-format conversion needs a display mode
+        if pygame.display.get_surface() is None:
+            return surface
+        return surface.convert_alpha() if alpha else surface.convert()
+
+    # -----------------------------------------------------------
+    # LOADING (safe to run on the preload thread)
+    # -----------------------------------------------------------
+    def _load(self, name, size):
+        path = self.path(name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            event_log.warning("assets", "missing asset, using placeholder", name=name)
+            return make_placeholder(size or (64, 64))
+
+        cache_path = self._cache_path(name, stat, size) if size else None
+        if cache_path is not None:
+            cached = self._read_cache(cache_path, size)
+            if cached is not None:
+                return cached
+
+        try:
+            surface = pygame.image.load(path)
+        except (pygame.error, OSError) as e:
+            event_log.error("assets", "could not load asset, using placeholder", name=name, error=str(e))
+            return make_placeholder(size or (64, 64))
+
+        if size and surface.get_size() != tuple(size):
+            # smoothscale only handles 24/32-bit surfaces
+            scale = pygame.transform.smoothscale if surface.get_bitsize() >= 24 else pygame.transform.scale
+            surface = scale(surface, size)
+            if cache_path is not None:
+                self._write_cache(cache_path, surface, self._cache_stem(name), size)
+        return surface
+
+    def _cache_stem(self, name):
+        return re.sub(r"[^A-Za-z0-9._]", "_", name)
+
+    def _cache_path(self, name, stat, size):
+        return os.path.join(self.cache_dir, f"{self._cache_stem(name)}-{stat.st_mtime_ns}-{stat.st_size}-{size[0]}x{size[1]}.rgba")
+
+    def _read_cache(self, cache_path, size):
+        try:
+            with open(cache_path, "rb") as f:
+                data = f.read()
+            return pygame.image.frombytes(data, size, "RGBA")
+        except (OSError, ValueError, pygame.error):
+            return None
+
+    def _write_cache(self, cache_path, surface, stem, size):
+        # Written under a temporary name so a crash never leaves a torn file;
+        # entries for older versions of the same source and size are removed
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(pygame.image.tobytes(surface, "RGBA"))
+            os.replace(tmp_path, cache_path)
+
+            file_name = os.path.basename(cache_path)
+            for other in os.listdir(self.cache_dir):
+                if other != file_name and other.startswith(f"{stem}-") and other.endswith(f"-{size[0]}x{size[1]}.rgba"):
+                    os.remove(os.path.join(self.cache_dir, other))
+        except OSError as e:
+            event_log.warning("assets", "could not write asset cache", path=cache_path, error=str(e))
+
+
+# Shared manager used by the game
+assets = AssetManager()
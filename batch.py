@@ -0,0 +1,286 @@
+import itertools
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from simulation import Simulation, TickInput, INPUT_MOUSE_DOWN, INPUT_MOUSE_UP
+from tower_grid import TOWER_BLUE, TOWER_BLACK
+
+
+# -----------------------------------------------------------
+# TUNABLE PARAMETERS
+# Name -> function(sim, value) that applies it to a fresh sim.
+# -----------------------------------------------------------
+def _set_cost(sim, value):
+    sim.item_blue.cost = sim.item_black.cost = int(value)
+
+
+PARAMETERS = {
+    "spawn_interval": lambda sim, v: setattr(sim, "spawn_interval", v),
+    "spawn_phase_duration": lambda sim, v: setattr(sim, "spawn_phase_duration", v),
+    "break_phase_duration": lambda sim, v: setattr(sim, "break_phase_duration", v),
+    "alien_spawn_delay": lambda sim, v: setattr(sim, "alien_spawn_delay", v),
+    "ball_spawn_interval": lambda sim, v: setattr(sim, "ball_spawn_interval", v),
+    "blue_health": lambda sim, v: sim.towers.tower_health.__setitem__(TOWER_BLUE, int(v)),
+    "black_health": lambda sim, v: sim.towers.tower_health.__setitem__(TOWER_BLACK, int(v)),
+    "shoot_interval": lambda sim, v: setattr(sim.towers, "shoot_interval", v),
+    "ball_interval": lambda sim, v: setattr(sim.towers, "ball_interval", v),
+    "tower_cost": _set_cost,
+    "blue_cost": lambda sim, v: setattr(sim.item_blue, "cost", int(v)),
+    "black_cost": lambda sim, v: setattr(sim.item_black, "cost", int(v)),
+}
+
+
+# -----------------------------------------------------------
+# CLASS: PlacementPolicy
+# Scripted player. Each tick it returns the TickInput to play:
+# it drags a tower onto the board (through the normal
+# PlaceableItem drag, so costs and rules apply) whenever
+# choose() picks one it can afford, and otherwise parks the
+# cursor on the nearest ball to collect money.
+# -----------------------------------------------------------
+class PlacementPolicy:
+    name = "collect"
+
+    def __init__(self):
+        self.queued = []
+
+    def next_input(self, sim):
+        if self.queued:
+            return self.queued.pop(0)
+        choice = self.choose(sim)
+        if choice is not None:
+            tower_name, row, col = choice
+            item = sim.item_blue if tower_name == "blue" else sim.item_black
+            if sim.player_money >= item.cost and not sim.towers.is_occupied(sim.towers.cell(row, col)):
+                self.queued = self._drag(sim, item, row, col)
+                return self.queued.pop(0)
+        return TickInput(self._nearest_ball(sim))
+
+    def choose(self, sim):
+        # (tower name, row, col) to place next, or None
+        return None
+
+    def _drag(self, sim, item, row, col):
+        layout = sim.layout
+        target = (layout.grid_origin_x + col * layout.cell_width + layout.cell_width // 2,
+                  layout.grid_origin_y + row * layout.cell_height + layout.cell_height // 2)
+        button = (item.x + item.width // 2, item.y + item.height // 2)
+        return [TickInput(button, [INPUT_MOUSE_DOWN]), TickInput(target), TickInput(target, [INPUT_MOUSE_UP])]
+
+    def _nearest_ball(self, sim):
+        if hasattr(sim, "ball_store"):
+            store = sim.ball_store
+            if not store.count:
+                return sim.mouse_pos
+            mx, my = sim.mouse_pos
+            i = int(((store["x"] - mx) ** 2 + (store["y"] - my) ** 2).argmin())
+            return (float(store["x"][i]), float(store["y"][i]))
+        if not sim.balls:
+            return sim.mouse_pos
+        mx, my = sim.mouse_pos
+        ball = min(sim.balls, key=lambda b: (b.x - mx) ** 2 + (b.y - my) ** 2)
+        return (ball.x, ball.y)
+
+    def _empty_cells(self, sim, cols):
+        towers = sim.towers
+        for col in cols:
+            for row in range(sim.layout.num_rows):
+                if not towers.is_occupied(towers.cell(row, col)):
+                    yield row, col
+
+
+class FrontBluePolicy(PlacementPolicy):
+    # Blue towers only, filling columns left to right
+    name = "front_blue"
+
+    def choose(self, sim):
+        return next((("blue", row, col) for row, col in self._empty_cells(sim, range(sim.layout.num_columns))), None)
+
+
+class EconomyPolicy(PlacementPolicy):
+    # Black towers down column 0 first, then blue towers from column 1
+    name = "economy"
+
+    def choose(self, sim):
+        for row, col in self._empty_cells(sim, [0]):
+            return ("black", row, col)
+        return next((("blue", row, col) for row, col in self._empty_cells(sim, range(1, sim.layout.num_columns))), None)
+
+
+class ThreatPolicy(PlacementPolicy):
+    # One black tower per two blue; blue goes to the lane with the most aliens
+    name = "threat"
+
+    def choose(self, sim):
+        towers = sim.towers
+        if len(towers.cells_of_type(TOWER_BLACK)) * 2 < len(towers.cells_of_type(TOWER_BLUE)):
+            return next((("black", row, col) for row, col in self._empty_cells(sim, [0, 1])), None)
+        lanes = _aliens_per_lane(sim)
+        for row in sorted(range(sim.layout.num_rows), key=lambda r: -lanes[r]):
+            for col in range(1, sim.layout.num_columns):
+                if not towers.is_occupied(towers.cell(row, col)):
+                    return ("blue", row, col)
+        return None
+
+
+def _aliens_per_lane(sim):
+    if hasattr(sim, "alien_store"):
+        rows = sim.alien_store["row"]
+        return [int((rows == row).sum()) for row in range(sim.layout.num_rows)]
+    return [len(row_aliens) for row_aliens in sim.aliens_by_row]
+
+
+POLICIES = {policy.name: policy for policy in (PlacementPolicy, FrontBluePolicy, EconomyPolicy, ThreatPolicy)}
+
+
+# -----------------------------------------------------------
+# FUNCTION: run_game
+# One headless game (runs in a worker process). Plays the
+# policy until game over or max_ms of game time and returns a
+# compact result: survival time, money sampled every sample_ms,
+# aliens killed and towers standing at the end.
+# -----------------------------------------------------------
+def run_game(job):
+    if job.get("arrays"):
+        from entity_store import ArraySimulation
+        sim = ArraySimulation(seed=job["seed"])
+    else:
+        sim = Simulation(seed=job["seed"])
+    for name, value in job["params"].items():
+        PARAMETERS[name](sim, value)
+    policy = POLICIES[job["policy"]]()
+
+    dt, max_ms, sample_ms = job["dt"], job["max_ms"], job["sample_ms"]
+    money_curve = [sim.player_money]
+    next_sample = sample_ms
+    start = time.perf_counter()
+    while not sim.game_over and sim.time < max_ms:
+        sim.step(dt, policy.next_input(sim))
+        if sim.time >= next_sample:
+            money_curve.append(sim.player_money)
+            next_sample += sample_ms
+
+    return {
+        "seed": job["seed"],
+        "params": job["params"],
+        "policy": job["policy"],
+        "survived": not sim.game_over,
+        "survival_ms": round(sim.game_over_time if sim.game_over else sim.time),
+        "money": sim.player_money,
+        "money_curve": money_curve,
+        "aliens_killed": sim.aliens_killed,
+        "towers": len(sim.towers),
+        "cpu_s": round(time.perf_counter() - start, 3),
+    }
+
+
+# -----------------------------------------------------------
+# JOBS AND AGGREGATION
+# -----------------------------------------------------------
+def parse_grid(settings):
+    # ["spawn_interval=400,500", "blue_health=6"] -> list of param dicts
+    axes = []
+    for setting in settings:
+        name, _, values = setting.partition("=")
+        if name not in PARAMETERS:
+            raise SystemExit(f"unknown parameter {name!r}; known: {', '.join(sorted(PARAMETERS))}")
+        axes.append([(name, float(value)) for value in values.split(",")])
+    return [dict(combo) for combo in itertools.product(*axes)]
+
+
+def make_jobs(grid, runs, base_seed, policy, max_ms, dt=1000 / 60, sample_ms=10000, arrays=False):
+    return [
+        {"seed": base_seed + i, "params": params, "policy": policy, "max_ms": max_ms,
+         "dt": dt, "sample_ms": sample_ms, "arrays": arrays}
+        for params in grid for i in range(runs)
+    ]
+
+
+def aggregate(results):
+    # One row per parameter combination, in first-seen order
+    groups = {}
+    for result in results:
+        groups.setdefault(json.dumps(result["params"], sort_keys=True), []).append(result)
+
+    rows = []
+    for key, group in groups.items():
+        survival = [r["survival_ms"] / 1000 for r in group]
+        mean = sum(survival) / len(survival)
+        rows.append({
+            "params": group[0]["params"],
+            "runs": len(group),
+            "survived": sum(r["survived"] for r in group) / len(group),
+            "survival_mean_s": mean,
+            "survival_sd_s": math.sqrt(sum((s - mean) ** 2 for s in survival) / len(survival)),
+            "survival_min_s": min(survival),
+            "money_mean": sum(r["money"] for r in group) / len(group),
+            "killed_mean": sum(r["aliens_killed"] for r in group) / len(group),
+            "towers_mean": sum(r["towers"] for r in group) / len(group),
+        })
+    return rows
+
+
+def format_table(rows):
+    header = ["params", "runs", "survived", "survival s", "sd", "min", "money", "killed", "towers"]
+    lines = [[
+        " ".join(f"{k}={v:g}" for k, v in row["params"].items()) or "(defaults)",
+        str(row["runs"]), f"{row['survived']:.0%}", f"{row['survival_mean_s']:.1f}",
+        f"{row['survival_sd_s']:.1f}", f"{row['survival_min_s']:.1f}", f"{row['money_mean']:.0f}",
+        f"{row['killed_mean']:.1f}", f"{row['towers_mean']:.1f}",
+    ] for row in rows]
+    widths = [max(len(line[i]) for line in [header] + lines) for i in range(len(header))]
+    out = ["  ".join(cell.ljust(width) for cell, width in zip(header, widths)).rstrip()]
+    out += ["  ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip() for line in lines]
+    return "\n".join(out)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run many seeded headless games in parallel and tabulate the results.")
+    parser.add_argument("--runs", type=int, default=8, help="seeded runs per parameter combination")
+    parser.add_argument("--seed", type=int, default=1, help="first seed (runs use seed, seed+1, ...)")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="economy")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=V1,V2",
+                        help=f"parameter values to sweep (repeatable); one of: {', '.join(sorted(PARAMETERS))}")
+    parser.add_argument("--minutes", type=float, default=10, help="stop a run after this much game time")
+    parser.add_argument("--sample-s", type=float, default=10, help="money curve sample interval")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+    parser.add_argument("--arrays", action="store_true", help="use the NumPy-backed ArraySimulation")
+    parser.add_argument("--jsonl", metavar="PATH", help="also write every run's result as a JSON line")
+    args = parser.parse_args(argv)
+
+    jobs = make_jobs(parse_grid(args.set), args.runs, args.seed, args.policy,
+                     args.minutes * 60000, sample_ms=args.sample_s * 1000, arrays=args.arrays)
+    results = []
+    out = open(args.jsonl, "w") if args.jsonl else None
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = [pool.submit(run_game, job) for job in jobs]
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                results.append(result)
+                if out is not None:
+                    out.write(json.dumps(result) + "\n")
+                    out.flush()
+                print(f"[{done}/{len(jobs)}] seed {result['seed']} {result['params'] or ''} "
+                      f"{'survived' if result['survived'] else 'lost'} at {result['survival_ms'] / 1000:.0f}s, "
+                      f"killed {result['aliens_killed']}", file=sys.stderr)
+    finally:
+        if out is not None:
+            out.close()
+
+    # Restore job order so the table rows follow the grid
+    order = {(json.dumps(job["params"], sort_keys=True), job["seed"]): i for i, job in enumerate(jobs)}
+    results.sort(key=lambda r: order[(json.dumps(r["params"], sort_keys=True), r["seed"])])
+    print(format_table(aggregate(results)))
+    print(f"{len(jobs)} runs in {time.perf_counter() - start:.1f}s on {args.workers} workers", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
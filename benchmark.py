@@ -0,0 +1,266 @@
+import glob
+import json
+import os
+import sys
+import time
+
+# Benchmarks always run without a real window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from camera import ZOOM_GRAIN
+from layout import GridLayout, DEFAULT_CELL_SIZE, SCREEN_WIDTH, SCREEN_HEIGHT
+from renderer import Renderer
+from simulation import Simulation, TickInput
+
+
+SCENARIO_DIR = os.path.join(os.path.dirname(__file__), "benchmarks")
+
+# Phases reported per tick, in loop order
+PHASES = ("events", "aliens", "spawning", "lasers", "balls", "background", "ui", "entities", "overlay", "present")
+
+
+# -----------------------------------------------------------
+# CLASS: PhaseTimer
+# Lap timer plugged into Simulation.phase_mark and
+# Renderer.phase_mark. Each lap(name) charges the time since
+# the previous lap to that phase for the current tick.
+# -----------------------------------------------------------
+class PhaseTimer:
+    def __init__(self):
+        self.samples = {phase: [] for phase in PHASES}
+        self.samples["total"] = []
+        self.current = {}
+        self.tick_start = self.last = 0.0
+
+    def start_tick(self):
+        self.current = {}
+        self.tick_start = self.last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.current[phase] = self.current.get(phase, 0.0) + (now - self.last)
+        self.last = now
+
+    def end_tick(self):
+        for phase in PHASES:
+            self.samples[phase].append(self.current.get(phase, 0.0) * 1000)
+        self.samples["total"].append((self.last - self.tick_start) * 1000)
+
+
+def percentile(sorted_values, pct):
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(values):
+    ordered = sorted(values)
+    return {
+        "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+        "p50": percentile(ordered, 50),
+        "p90": percentile(ordered, 90),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1] if ordered else 0.0,
+    }
+
+
+# -----------------------------------------------------------
+# SCENARIOS
+# A scenario is a JSON file in benchmarks/ describing the
+# starting board; see benchmarks/README.md for the fields.
+# -----------------------------------------------------------
+def load_scenarios(names=None, scenario_dir=SCENARIO_DIR):
+    scenarios = []
+    for path in sorted(glob.glob(os.path.join(scenario_dir, "*.json"))):
+        with open(path) as f:
+            scenario = json.load(f)
+        scenario.setdefault("name", os.path.splitext(os.path.basename(path))[0])
+        if names and scenario["name"] not in names:
+            continue
+        scenarios.append(scenario)
+    return scenarios
+
+
+def build_simulation(scenario):
+    layout = None
+    if "grid" in scenario:
+        layout = GridLayout(*scenario["grid"], cell_size=tuple(scenario.get("cell_size", DEFAULT_CELL_SIZE)))
+    if scenario.get("backend", "objects") == "arrays":
+        from entity_store import ArraySimulation
+        sim = ArraySimulation(layout, seed=scenario.get("seed", 0))
+    else:
+        sim = Simulation(layout, seed=scenario.get("seed", 0))
+    layout = sim.layout
+
+    sim.player_money = scenario.get("money", 0)
+    if not scenario.get("spawning", True):
+        sim.alien_spawn_delay = float("inf")
+    if not scenario.get("natural_balls", True):
+        sim.natural_balls = False
+
+    # Towers: "fill" covers the whole board, "towers" lists [row, col, type]
+    fill = scenario.get("fill")
+    if fill:
+        for row in range(layout.num_rows):
+            for col in range(layout.num_columns):
+                sim.towers.place(row, col, fill)
+    for row, col, tower_type in scenario.get("towers", []):
+        sim.towers.place(row, col, tower_type)
+
+    # Aliens: aliens_per_lane spread alien_spacing px apart from alien_start_x
+    start_x = scenario.get("alien_start_x", layout.board_width)
+    spacing = scenario.get("alien_spacing", 4)
+    for row in range(layout.num_rows):
+        for i in range(scenario.get("aliens_per_lane", 0)):
+            _add_alien(sim, row, start_x + i * spacing)
+
+    for _ in range(scenario.get("balls", 0)):
+        _add_ball(sim)
+    return sim
+
+
+def _add_alien(sim, row, x):
+    layout = sim.layout
+    if hasattr(sim, "alien_store"):
+        sim.alien_store.add(
+            handle=sim.handles.new(), row=row, x=x, prev_x=x,
+            y=layout.grid_origin_y + row * layout.cell_height + (layout.cell_height // 4),
+            speed=0.35, health=8, alpha=255,
+        )
+        return
+    alien = sim.pools.aliens.acquire(row, layout.cell_width, layout.cell_height, layout.grid_origin_x, layout.grid_origin_y)
+    alien.handle = sim.handles.new()
+    alien.x = alien.prev_x = x
+    sim.aliens_by_row[row].append(alien)
+
+
+def _add_ball(sim):
+    ball = sim.pools.balls.acquire(sim.rng, sim.layout.board_width, sim.layout.board_height)
+    ball.handle = sim.handles.new()
+    if hasattr(sim, "ball_store"):
+        sim.ball_store.add(handle=ball.handle, x=ball.x, y=ball.y, prev_x=ball.x, prev_y=ball.y, dx=ball.dx, dy=ball.dy)
+        sim.pools.balls.release(ball)
+    else:
+        sim.balls.append(ball)
+        sim.ball_hash.insert(ball)
+
+
+# -----------------------------------------------------------
+# FUNCTION: run_scenario
+# Runs one scenario for its fixed number of ticks through the
+# same loop main() uses (events, Simulation.step, Renderer)
+# and returns per-phase ms/tick statistics.
+# -----------------------------------------------------------
+def run_scenario(scenario, screen=None):
+    sim = build_simulation(scenario)
+    timer = PhaseTimer()
+    sim.phase_mark = timer.lap
+
+    renderer = None
+    if scenario.get("render", True):
+        renderer = Renderer(screen, sim)
+        if "camera" in scenario:
+            # [x, y, zoom]: board position at the window's top-left
+            camera = renderer.camera
+            x, y, zoom = scenario["camera"]
+            camera.zoom = round(zoom * ZOOM_GRAIN) / ZOOM_GRAIN
+            camera.x, camera.y = x, y
+            camera.clamp()
+        renderer.phase_mark = timer.lap
+
+    inputs = TickInput(tuple(scenario.get("mouse", (-1000, -1000))))
+    dt = scenario.get("dt", 1000 / 60)
+    ticks = scenario.get("ticks", 600)
+    counts_start = sim.entity_counts()
+
+    for _ in range(ticks):
+        timer.start_tick()
+        pygame.event.pump()
+        pygame.event.get()
+        timer.lap("events")
+        sim.step(dt, inputs)
+        if renderer is not None:
+            renderer.draw()
+            renderer.present()
+        timer.end_tick()
+
+    return {
+        "ticks": ticks,
+        "entities_start": counts_start,
+        "entities_end": sim.entity_counts(),
+        "phases": {phase: summarize(values) for phase, values in timer.samples.items()},
+    }
+
+
+# -----------------------------------------------------------
+# FUNCTION: compare
+# Compares results against a baseline. Returns a list of
+# (scenario, phase, baseline_ms, current_ms, change_pct)
+# for every p50/p90 that got slower by more than threshold %.
+# -----------------------------------------------------------
+def compare(results, baseline, threshold=10.0, min_ms=0.05):
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for phase, stats in result["phases"].items():
+            base_stats = base["phases"].get(phase)
+            if base_stats is None:
+                continue
+            for key in ("p50", "p90"):
+                old, new = base_stats[key], stats[key]
+                if new < min_ms and old < min_ms:
+                    continue  # too small to measure reliably
+                change = (new - old) / old * 100 if old else float("inf")
+                if change > threshold:
+                    regressions.append((name, f"{phase}.{key}", old, new, change))
+    return regressions
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the game loop stress benchmarks.")
+    parser.add_argument("scenarios", nargs="*", help="scenario names (default: all in benchmarks/)")
+    parser.add_argument("--out", help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="compare against this results JSON")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    parser.add_argument("--ticks", type=int, help="override every scenario's tick count")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    results = {}
+    for scenario in load_scenarios(args.scenarios):
+        if args.ticks:
+            scenario["ticks"] = args.ticks
+        print(f"running {scenario['name']} ({scenario.get('ticks', 600)} ticks)...", file=sys.stderr)
+        results[scenario["name"]] = run_scenario(scenario, screen)
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, phase, old, new, change in regressions:
+            print(f"REGRESSION {name} {phase}: {old:.3f} -> {new:.3f} ms (+{change:.0f}%)", file=sys.stderr)
+        if regressions:
+            return 1
+        print("no regressions against baseline", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
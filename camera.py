@@ -0,0 +1,128 @@
+# Zoom limits, and the step one mouse wheel notch zooms by
+ZOOM_MIN, ZOOM_MAX = 0.25, 2.0
+ZOOM_STEP = 1.25
+
+# Extra board pixels around the view that are still captured
+# for drawing, covering sprites that straddle its edges and
+# camera moves between capturing a frame and drawing it
+VIEW_MARGIN = 64
+
+# Zoom levels are multiples of 1 / ZOOM_GRAIN, so a background
+# chunk of that many board pixels is a whole number of window
+# pixels at every zoom (see Compositor)
+ZOOM_GRAIN = 256
+
+# Cursor position for ball pickup while the cursor is over the
+# HUD band of a scrolled or zoomed view: far enough off the
+# board that no ball is ever near it
+OFF_BOARD = (-1000, -1000)
+
+
+# -----------------------------------------------------------
+# CLASS: Camera
+# Which part of the board (see GridLayout) the window shows.
+# x, y is the board position at the window's top-left corner
+# and zoom is window pixels per board pixel, so
+#
+#   window = (board - (x, y)) * zoom
+#
+# The camera never scrolls the grid out of view: at the top-left
+# limit the grid sits where the default layout puts it, and it
+# can't scroll past the board's right and bottom edges. A board
+# that fits the window (the default 9x5 grid) therefore stays
+# put at x = y = 0, zoom 1, where board and window coordinates
+# are the same.
+#
+# The HUD band across the top of the window (item buttons and
+# money) isn't scrolled or zoomed: to_world() passes pointer
+# positions there through unchanged, so the item buttons work
+# wherever the camera is. Balls under the HUD are only drawn
+# (and so only collected, see pickup_pos()) while the camera is
+# at home.
+# -----------------------------------------------------------
+class Camera:
+    def __init__(self, layout, view_width=None, view_height=None):
+        self.layout = layout
+        self.view_width = view_width or layout.screen_width
+        self.view_height = view_height or layout.screen_height
+        self.hud_height = layout.grid_origin_y
+        self.reset()
+
+    def reset(self):
+        self.zoom = 1.0
+        self.x, self.y = self._limits()[::2]
+
+    def _limits(self):
+        # (min x, max x, min y, max y) at the current zoom
+        layout, zoom = self.layout, self.zoom
+        min_x = layout.grid_origin_x * (1 - 1 / zoom)
+        min_y = layout.grid_origin_y * (1 - 1 / zoom)
+        max_x = max(min_x, layout.board_width - self.view_width / zoom)
+        max_y = max(min_y, layout.board_height - self.view_height / zoom)
+        return min_x, max_x, min_y, max_y
+
+    def clamp(self):
+        min_x, max_x, min_y, max_y = self._limits()
+        self.x = min(max(self.x, min_x), max_x)
+        self.y = min(max(self.y, min_y), max_y)
+
+    # -----------------------------------------------------------
+    # MOVING THE CAMERA
+    # -----------------------------------------------------------
+    def scroll(self, dx, dy):
+        # dx, dy in window pixels
+        self.x += dx / self.zoom
+        self.y += dy / self.zoom
+        self.clamp()
+
+    def zoom_at(self, factor, pos):
+        # Zooms by factor, keeping the board point under pos (a window
+        # position, e.g. the cursor) where it is
+        zoom = round(min(max(self.zoom * factor, ZOOM_MIN), ZOOM_MAX) * ZOOM_GRAIN) / ZOOM_GRAIN
+        if zoom == self.zoom:
+            return
+        world_x, world_y = self.x + pos[0] / self.zoom, self.y + pos[1] / self.zoom
+        self.zoom = zoom
+        self.x, self.y = world_x - pos[0] / zoom, world_y - pos[1] / zoom
+        self.clamp()
+
+    # -----------------------------------------------------------
+    # COORDINATES
+    # -----------------------------------------------------------
+    def to_world(self, pos):
+        # Window position -> board position, in whole pixels so live
+        # games and their recordings see the same input
+        if pos[1] < self.hud_height:
+            return pos
+        return round(self.x + pos[0] / self.zoom), round(self.y + pos[1] / self.zoom)
+
+    def at_home(self):
+        # Board and window coordinates line up (to the pixel)
+        return self.transform() == (1, 0, 0)
+
+    def pickup_pos(self, pos):
+        # Where the cursor at window position pos collects balls: the
+        # board position under it, or nowhere while it's over the HUD
+        # band and that isn't showing the board beneath it
+        if pos[1] < self.hud_height and not self.at_home():
+            return OFF_BOARD
+        return self.to_world(pos)
+
+    def transform(self, scale=1.0):
+        # (k, ox, oy) to draw the board onto a canvas `scale` times the
+        # window size: canvas = board * k + (ox, oy). k is rounded to a
+        # multiple of 1 / ZOOM_GRAIN, never below one, and the offsets to
+        # whole pixels.
+        k = max(1, round(self.zoom * scale * ZOOM_GRAIN)) / ZOOM_GRAIN
+        return k, round(-self.x * k), round(-self.y * k)
+
+    def view_rect(self, margin=VIEW_MARGIN):
+        # (left, top, right, bottom) of the board area in the window, or
+        # None if that is the whole board
+        layout = self.layout
+        left, top = self.x - margin, self.y - margin
+        right = self.x + self.view_width / self.zoom + margin
+        bottom = self.y + self.view_height / self.zoom + margin
+        if left <= 0 and top <= 0 and right >= layout.board_width and bottom >= layout.board_height:
+            return None
+        return left, top, right, bottom
@@ -0,0 +1,79 @@
+# -----------------------------------------------------------
+# CLASS: HandleAllocator
+# Hands out stable integer handles for entities (aliens, towers,
+# lasers, balls). A handle is never reused within a game, so a
+# stale handle can never point at a different entity. 0 means
+# "no entity".
+# -----------------------------------------------------------
+class HandleAllocator:
+    def __init__(self, next_handle=1):
+        self.next_handle = next_handle
+
+    def new(self):
+        handle = self.next_handle
+        self.next_handle += 1
+        return handle
+
+
+# -----------------------------------------------------------
+# CLASS: ComponentTable
+# Dense per-entity component storage keyed by handle. Each field
+# is a plain list (column); slots maps a handle to its row.
+# Lookup, add and remove are O(1): removal moves the last row
+# into the freed slot, so the columns never have holes.
+#
+#   attacks = ComponentTable("attack_timer", "target")
+#   attacks.add(alien.handle, attack_timer=1250, target=tower)
+#   slot = attacks.slots.get(alien.handle)
+#   attacks.columns["attack_timer"][slot] += dt
+# -----------------------------------------------------------
+class ComponentTable:
+    def __init__(self, *fields):
+        self.fields = fields
+        self.handles = []
+        self.slots = {}  # handle -> row in every column
+        self.columns = {field: [] for field in fields}
+
+    def __len__(self):
+        return len(self.handles)
+
+    def __contains__(self, handle):
+        return handle in self.slots
+
+    def add(self, handle, **values):
+        slot = self.slots.get(handle)
+        if slot is not None:
+            for field, value in values.items():
+                self.columns[field][slot] = value
+            return slot
+        slot = len(self.handles)
+        self.handles.append(handle)
+        self.slots[handle] = slot
+        for field, column in self.columns.items():
+            column.append(values.get(field))
+        return slot
+
+    def get(self, handle, field, default=None):
+        slot = self.slots.get(handle)
+        return default if slot is None else self.columns[field][slot]
+
+    def discard(self, handle):
+        slot = self.slots.pop(handle, None)
+        if slot is None:
+            return
+        last = len(self.handles) - 1
+        if slot != last:
+            moved = self.handles[last]
+            self.handles[slot] = moved
+            self.slots[moved] = slot
+            for column in self.columns.values():
+                column[slot] = column[last]
+        self.handles.pop()
+        for column in self.columns.values():
+            column.pop()
+
+    def clear(self):
+        self.handles.clear()
+        self.slots.clear()
+        for column in self.columns.values():
+            column.clear()
@@ -0,0 +1,239 @@
+from collections import OrderedDict
+
+import pygame
+
+from camera import Camera, ZOOM_GRAIN
+
+
+# -----------------------------------------------------------
+# FUNCTION: draw_rounded_rect
+# Simple helper function to draw rectangles with rounded corners.
+# -----------------------------------------------------------
+def draw_rounded_rect(surface, color, rect, radius):
+    pygame.draw.rect(surface, color, pygame.Rect(rect), border_radius=radius)
+
+
+# -----------------------------------------------------------
+# FUNCTION: draw_board
+# Draws the part of the board (the grid panel with its
+# checkerboard cells) that lands on surface when the surface's
+# top-left corner is at board position (left, top). Only the
+# cells overlapping the surface are drawn. rounded=False draws
+# square corners.
+# -----------------------------------------------------------
+def draw_board(surface, layout, rounded=True, left=0, top=0):
+    corner = 1 if rounded else 0  # multiplies every corner radius
+    width, height = surface.get_size()
+    draw_rounded_rect(surface, "#2C363F", (layout.grid_origin_x - left, layout.grid_origin_y - top, layout.grid_width, layout.grid_height), radius=5 * corner)
+
+    # Draw grid cells (each overlaps the next one by 7px)
+    rows, cols = layout.cells_in(left - layout.cell_width - 7, top, left + width, top + height)
+    for row in rows:
+        for col in cols:
+            cell_color = "#333333" if (row + col) % 2 == 0 else "#535657"
+            draw_rounded_rect(
+                surface,
+                cell_color,
+                (
+                    layout.grid_origin_x + col * layout.cell_width - left,
+                    layout.grid_origin_y + row * layout.cell_height - top,
+                    layout.cell_width + 7,
+                    layout.cell_height
+                ),
+                radius=5 * corner
+            )
+
+
+# -----------------------------------------------------------
+# FUNCTION: draw_hud_panels
+# Draws the two top UI panels (item buttons + money box).
+# -----------------------------------------------------------
+def draw_hud_panels(surface, layout, rounded=True):
+    corner = 1 if rounded else 0
+    draw_rounded_rect(surface, "#2F3061", (layout.margin_sides, 12.5, 550, 145), radius=10 * corner)
+    draw_rounded_rect(surface, "#2F3061", (layout.money_box_x, 12.5, layout.money_box_width, 145), radius=10 * corner)
+
+
+# Board pixels per side of a cached background chunk; a whole
+# number of canvas pixels at every zoom level (see camera.py)
+BOARD_CHUNK = ZOOM_GRAIN
+
+
+# -----------------------------------------------------------
+# CLASS: Compositor
+# Keeps the static layer pre-rendered in a cached surface and
+# only pushes the parts of the screen that changed.
+#
+# Each frame:
+# - begin_frame() restores the background under everything
+#   that was drawn last frame
+# - mark(rect) records each area drawn this frame
+# - end_frame() stretches the canvas to the screen (scaled
+#   rendering only)
+# - present() sends last frame's and this frame's areas to
+#   pygame.display.update(rects)
+#
+# Frames are drawn onto `canvas`. At scale 1 that is the screen
+# itself; set_scale(s) switches to an offscreen canvas s times
+# the screen size, which end_frame() stretches to the window,
+# so drawing costs drop with the pixel count. Scaled frames are
+# always presented whole.
+#
+# The background follows the Camera. The board is drawn in
+# square chunks of BOARD_CHUNK board pixels, each rendered once
+# per zoom level and kept in an LRU cache of up to
+# max_chunk_pixels; a frame only ever touches the chunks in
+# view, so a 100-column board costs no more than the default
+# one. The HUD band across the top is drawn over it unscrolled.
+# -----------------------------------------------------------
+class Compositor:
+    def __init__(self, screen, layout, camera=None, max_dirty_rects=256, max_chunk_pixels=4_000_000):
+        self.screen = screen
+        self.canvas = screen
+        self.layout = layout
+        self.camera = camera or Camera(layout, *screen.get_size())
+        self.scale = 1.0
+        self.rounded_corners = True
+        self.max_dirty_rects = max_dirty_rects  # above this, one full update is cheaper
+        self.background = None
+        self.background_key = None
+        self.previous_rects = []
+        self.current_rects = []
+        self.full_redraw = True
+
+        self.max_chunk_pixels = max_chunk_pixels
+        self.chunks = OrderedDict()  # (chunk x, chunk y, size in px, rounded) -> Surface
+        self.chunk_pixels = 0
+        self.chunks_layout = None  # layout signature the cached chunks were drawn for
+        self.hud = None
+        self.hud_key = None
+
+    def invalidate(self):
+        # Force the next frame to redraw and present the whole screen
+        self.full_redraw = True
+
+    def set_scale(self, scale, rounded_corners=True):
+        if scale == self.scale and rounded_corners == self.rounded_corners:
+            return
+        self.scale = scale
+        self.rounded_corners = rounded_corners
+        if scale == 1.0:
+            self.canvas = self.screen
+        else:
+            width, height = self.screen.get_size()
+            self.canvas = pygame.Surface((max(1, round(width * scale)), max(1, round(height * scale)))).convert()
+        self.previous_rects = []
+        self.full_redraw = True
+
+    def _background_key(self):
+        return (self.canvas.get_size(), self.rounded_corners, self.layout.signature(), self.camera.transform(self.scale))
+
+    def hud_height(self):
+        # Height of the unscrolled HUD band on the canvas
+        return round(self.camera.hud_height * self.scale)
+
+    def board_rect(self):
+        # Canvas area below the HUD band, where the board shows
+        width, height = self.canvas.get_size()
+        hud_height = self.hud_height()
+        return pygame.Rect(0, hud_height, width, height - hud_height)
+
+    def _build_background(self):
+        layout = self.layout
+        width, height = self.canvas.get_size()
+        background = pygame.Surface((width, height)).convert()
+        background.fill((0, 0, 0))
+
+        # Board chunks in view
+        k, ox, oy = self.camera.transform(self.scale)
+        size = round(BOARD_CHUNK * k)
+        first_x, first_y = max(0, -ox // size), max(0, -oy // size)
+        last_x = min((layout.board_width - 1) // BOARD_CHUNK, (width - 1 - ox) // size)
+        last_y = min((layout.board_height - 1) // BOARD_CHUNK, (height - 1 - oy) // size)
+        for chunk_y in range(first_y, last_y + 1):
+            for chunk_x in range(first_x, last_x + 1):
+                background.blit(self._chunk(chunk_x, chunk_y, size), (chunk_x * size + ox, chunk_y * size + oy))
+
+        background.blit(self._hud(), (0, 0))
+        self.background = background
+        self.background_key = self._background_key()
+
+    def _hud(self):
+        key = (self.canvas.get_size(), self.rounded_corners, self.layout.signature())
+        if self.hud_key != key:
+            # Always drawn at full size, then shrunk
+            layout = self.layout
+            hud = pygame.Surface((layout.screen_width, self.camera.hud_height)).convert()
+            hud.fill((0, 0, 0))
+            draw_hud_panels(hud, layout, self.rounded_corners)
+            if self.canvas is not self.screen:
+                hud = pygame.transform.smoothscale(hud, (self.canvas.get_width(), self.hud_height()))
+            self.hud, self.hud_key = hud, key
+        return self.hud
+
+    def _chunk(self, chunk_x, chunk_y, size):
+        signature = self.layout.signature()
+        if self.chunks_layout != signature:
+            self.chunks.clear()
+            self.chunk_pixels = 0
+            self.chunks_layout = signature
+
+        key = (chunk_x, chunk_y, size, self.rounded_corners)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+
+        # Drawn at full size, then scaled to the zoom level
+        chunk = pygame.Surface((BOARD_CHUNK, BOARD_CHUNK)).convert()
+        chunk.fill((0, 0, 0))
+        draw_board(chunk, self.layout, self.rounded_corners, chunk_x * BOARD_CHUNK, chunk_y * BOARD_CHUNK)
+        if size != BOARD_CHUNK:
+            chunk = pygame.transform.smoothscale(chunk, (size, size))
+        self.chunks[key] = chunk
+        self.chunk_pixels += size * size
+        while self.chunk_pixels > self.max_chunk_pixels and len(self.chunks) > 1:
+            _, old = self.chunks.popitem(last=False)
+            self.chunk_pixels -= old.get_width() * old.get_height()
+        return chunk
+
+    def begin_frame(self):
+        # Rebuild the cached static layer on resize, scale, layout or camera change
+        if self.background_key != self._background_key():
+            self._build_background()
+            self.full_redraw = True
+
+        canvas = self.canvas
+        if self.full_redraw:
+            canvas.blit(self.background, (0, 0))
+        else:
+            for rect in self.previous_rects:
+                canvas.blit(self.background, rect, rect)
+        self.current_rects = []
+
+    def mark(self, rect):
+        # Accepts a Rect, a list of Rects, or None (nothing drawn)
+        if rect is None:
+            return
+        if isinstance(rect, list):
+            self.current_rects.extend(rect)
+        else:
+            self.current_rects.append(rect)
+
+    def mark_full(self):
+        # Something covered the whole screen this frame (e.g. an overlay)
+        self.full_redraw = True
+        self.current_rects = [self.canvas.get_rect()]
+
+    def end_frame(self):
+        if self.canvas is not self.screen:
+            pygame.transform.scale(self.canvas, self.screen.get_size(), self.screen)
+
+    def present(self):
+        dirty = self.previous_rects + self.current_rects
+        if self.full_redraw or self.canvas is not self.screen or len(dirty) > self.max_dirty_rects:
+            pygame.display.update()
+        else:
+            pygame.display.update(dirty)
+        self.full_redraw = False
+        self.previous_rects = self.current_rects
@@ -0,0 +1,194 @@
+import random
+
+from layout import SCREEN_WIDTH, SCREEN_HEIGHT
+
+
+# -----------------------------------------------------------
+# CLASS: Alien
+# Represents one alien moving horizontally across a grid row.
+# Pooled (see pools.py): reset() re-initializes a recycled alien.
+# -----------------------------------------------------------
+class Alien:
+    __slots__ = ("handle", "row", "x", "prev_x", "y", "width", "height", "speed", "health", "alpha", "hit_timer")
+
+    def __init__(self, row, cell_width, cell_height, grid_origin_x, grid_origin_y, start_x=SCREEN_WIDTH):
+        self.reset(row, cell_width, cell_height, grid_origin_x, grid_origin_y, start_x)
+
+    def reset(self, row, cell_width, cell_height, grid_origin_x, grid_origin_y, start_x=SCREEN_WIDTH):
+        # start_x: the right edge of the board, where aliens enter
+        self.handle = 0  # stable id, assigned by the simulation
+        self.row = row
+        self.x = start_x
+        self.prev_x = self.x  # x before the last update, for render interpolation
+        self.y = grid_origin_y + row * cell_height + (cell_height // 4)
+        self.width = cell_width // 2
+        self.height = self.width
+        self.speed = 0.35  # movement speed (slower for balance)
+        self.health = 8  # takes 4 shots to die (since laser deals 2 damage)
+        self.alpha = 255  # full opacity
+        self.hit_timer = 0  # 60 Hz ticks remaining for see-through effect
+
+    def update(self, scale=1.0):
+        # scale: length of this tick in 60 Hz ticks (see simulation.BASE_TICK_MS)
+        self.prev_x = self.x
+        self.x -= self.speed * scale  # move left every tick
+        if self.hit_timer > 0:
+            self.hit_timer -= scale
+            if self.hit_timer <= 0:
+                self.hit_timer = 0
+                self.alpha = 255  # restore full opacity
+
+    def hit(self):
+        self.health -= 2  # laser deals 2 damage per hit
+        self.alpha = 100  # see-through
+        self.hit_timer = 10  # frames to stay see-through
+
+    def is_off_screen(self):
+        return self.x + self.width < 0  # if alien is completely off screen
+
+
+ALIEN_SPEED = 0.45  # px per 60 Hz tick while not blocked; set from an alien's first tick on
+BALL_PICKUP_RADIUS = 30  # px from the cursor at which a ball is collected
+BALL_MAX_SPEED = 0.5  # px per 60 Hz tick, on each axis
+
+
+# -----------------------------------------------------------
+# CLASS: FloatingBall
+# Floating balls that wander around and give money when clicked.
+# Pooled (see pools.py): reset() re-initializes a recycled ball.
+# -----------------------------------------------------------
+class FloatingBall:
+    __slots__ = ("handle", "x", "y", "prev_x", "prev_y", "radius", "dx", "dy")
+
+    def __init__(self, rng=random, board_width=SCREEN_WIDTH, board_height=SCREEN_HEIGHT):
+        self.reset(rng, board_width, board_height)
+
+    def reset(self, rng=random, board_width=SCREEN_WIDTH, board_height=SCREEN_HEIGHT):
+        # rng: the simulation's seeded random.Random (defaults to the global one)
+        self.handle = 0  # stable id, assigned by the simulation
+        # Starts 100 px in from the sides and bottom and below the HUD;
+        # on boards too small for that, in from the bottom-right half
+        x_max = max(board_width - 100, board_width // 2)
+        y_max = max(board_height - 100, board_height // 2)
+        self.x = rng.randint(min(100, x_max), x_max)
+        self.y = rng.randint(min(200, y_max), y_max)
+        self.prev_x, self.prev_y = self.x, self.y
+        self.radius = 10
+        self.dx = rng.uniform(-BALL_MAX_SPEED, BALL_MAX_SPEED)
+        self.dy = rng.uniform(-BALL_MAX_SPEED, BALL_MAX_SPEED)
+
+    def update(self, scale=1.0, board_width=SCREEN_WIDTH, board_height=SCREEN_HEIGHT):
+        # Move the ball and bounce off the board's edges
+        self.prev_x, self.prev_y = self.x, self.y
+        self.x += self.dx * scale
+        self.y += self.dy * scale
+        if self.x < 0 or self.x > board_width:
+            self.dx *= -1
+        if self.y < 0 or self.y > board_height:
+            self.dy *= -1
+
+
+# -----------------------------------------------------------
+# CLASS: Laser
+# Represents a laser shot from blue items towards aliens.
+# Pooled (see pools.py): reset() re-initializes a recycled laser.
+# -----------------------------------------------------------
+class Laser:
+    __slots__ = ("handle", "x", "prev_x", "y", "row", "width", "height", "speed")
+
+    def __init__(self, x, y, row):
+        self.reset(x, y, row)
+
+    def reset(self, x, y, row):
+        self.handle = 0  # stable id, assigned by the simulation
+        self.x = x
+        self.prev_x = x
+        self.y = y
+        self.row = row
+        self.width = 10
+        self.height = 5
+        self.speed = 5  # move right
+
+    def update(self, scale=1.0):
+        self.prev_x = self.x
+        self.x += self.speed * scale
+
+    def is_off_screen(self, board_width=SCREEN_WIDTH):
+        return self.x > board_width
+
+    def contact_time(self, alien):
+        # Swept test over the last update: both moved in a straight line
+        # from prev_x to x (the laser right, the alien left or not at all),
+        # so their x gap only grows and they touched during the tick iff
+        # the laser started left of the alien's right edge and ended past
+        # its left edge. Returns when they first touched (0..1), or None.
+        if not (self.y < alien.y + alien.height and self.y + self.height > alien.y):
+            return None
+        start = self.prev_x - alien.prev_x  # laser x relative to the alien
+        end = self.x - alien.x
+        if start >= alien.width or end <= -self.width:
+            return None
+        if start > -self.width:
+            return 0.0  # already overlapping at the start of the tick
+        return (-self.width - start) / (end - start)
+
+
+# -----------------------------------------------------------
+# CLASS: PlaceableItem
+# Represents a draggable item button (like towers). Dropping it
+# onto a grid cell places a tower of its type in the TowerGrid.
+# -----------------------------------------------------------
+class PlaceableItem:
+    def __init__(self, x, y, width, height, item_type="blue", cost=15):
+        self.original_x = x
+        self.original_y = y
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.dragging = False
+        self.type = item_type
+        self.cost = cost  # blue: 15, black: 15
+
+    def start_drag(self):
+        self.dragging = True
+
+    def stop_drag(self, towers, grid_origin_x, grid_origin_y, cell_width, cell_height, num_columns, num_rows, player_money):
+        self.dragging = False
+
+        # Determine which grid cell the item was dropped into
+        col = (self.x - grid_origin_x + self.width // 2) // cell_width
+        row = (self.y - grid_origin_y + self.height // 2) // cell_height
+
+        # Clamp to valid grid indices
+        col = max(0, min(num_columns - 1, col))
+        row = max(0, min(num_rows - 1, row))
+
+        # Only place if the player has enough money and the cell is free
+        if player_money >= self.cost and towers.place(row, col, self.type):
+            player_money -= self.cost
+
+        # Return item back to original place
+        self.x = self.original_x
+        self.y = self.original_y
+
+        return player_money
+
+    def update_position(self, mouse_pos):
+        if self.dragging:
+            self.x = mouse_pos[0] - self.width // 2
+            self.y = mouse_pos[1] - self.height // 2
+
+    def preview_position(self, grid_origin_x, grid_origin_y, cell_width, cell_height, num_columns, num_rows):
+        # Where the item would land if dropped now, or None if not dragging
+        if not self.dragging:
+            return None
+        col = (self.x - grid_origin_x + self.width // 2) // cell_width
+        row = (self.y - grid_origin_y + self.height // 2) // cell_height
+
+        col = max(0, min(num_columns - 1, col))
+        row = max(0, min(num_rows - 1, row))
+
+        snap_x = grid_origin_x + col * cell_width + (cell_width - self.width) // 2
+        snap_y = grid_origin_y + row * cell_height + (cell_height - self.height) // 2
+        return snap_x, snap_y
@@ -0,0 +1,300 @@
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only ArraySimulation needs it
+    np = None
+
+from event_log import event_log
+from simulation import BASE_TICK_MS, TIMER_ALIEN_SPAWN, TIMER_BALL_SPAWN, Simulation
+from entities import ALIEN_SPEED, BALL_PICKUP_RADIUS
+from tower_grid import TOWER_EMPTY, TOWER_BLUE, TOWER_BLACK
+
+
+# -----------------------------------------------------------
+# CLASS: EntityStore
+# Structure-of-arrays storage for one kind of entity. Every
+# field is a contiguous NumPy array; entity i is row i of every
+# array. Removal compacts the arrays while keeping order, so
+# older entities always come before newer ones.
+# -----------------------------------------------------------
+class EntityStore:
+    def __init__(self, fields, capacity=64):
+        if np is None:
+            raise RuntimeError("EntityStore needs numpy (pip install numpy)")
+        self.fields = dict(fields)  # name -> dtype
+        self.capacity = capacity
+        self.count = 0
+        self.arrays = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.fields.items()}
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, name):
+        # Live view of the active part of one field
+        return self.arrays[name][:self.count]
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        for name, array in self.arrays.items():
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[:self.count] = array[:self.count]
+            self.arrays[name] = grown
+        self.capacity = capacity
+
+    def add(self, **values):
+        if self.count == self.capacity:
+            self._grow(self.count + 1)
+        index = self.count
+        for name, array in self.arrays.items():
+            array[index] = values.get(name, 0)  # slot may hold a removed entity's data
+        self.count += 1
+        return index
+
+    def keep(self, mask):
+        # Drop every entity whose mask entry is False
+        kept = int(mask.sum())
+        if kept == self.count:
+            return
+        for name, array in self.arrays.items():
+            array[:kept] = array[:self.count][mask]
+        self.count = kept
+
+    def load(self, count, columns):
+        # Replaces the contents with count entities from {field: array}
+        if count > self.capacity:
+            self._grow(count)
+        for name, array in self.arrays.items():
+            array[:count] = columns[name] if name in columns else 0
+        self.count = count
+
+    def clear(self):
+        self.count = 0
+
+
+# -----------------------------------------------------------
+# CLASS: ArraySimulation
+# Same game as Simulation, but aliens, lasers and balls live in
+# EntityStores instead of Python objects. Movement, edge bounces,
+# off-screen culling, hit-flash decay and ball pickup each run
+# as one vectorized pass over a whole entity kind.
+#
+# Towers, input and timers are shared with Simulation. The only
+# rule difference: several lasers can hit the same alien in the
+# same tick, even if an earlier one already killed it.
+# Laser hits use a sorted per-lane search (searchsorted), so they
+# cost O((lasers + aliens) log aliens) per lane.
+# -----------------------------------------------------------
+class ArraySimulation(Simulation):
+    def __init__(self, layout=None, seed=None):
+        super().__init__(layout, seed)
+        layout = self.layout
+
+        self.alien_store = EntityStore({
+            "handle": np.int64, "row": np.int32, "x": np.float64, "prev_x": np.float64, "y": np.float64, "speed": np.float64,
+            "health": np.int32, "alpha": np.int32, "hit_timer": np.float64,
+            "attack_timer": np.float64, "target": np.int64,  # target: tower handle, 0 = none
+        })
+        self.laser_store = EntityStore({"handle": np.int64, "row": np.int32, "x": np.float64, "prev_x": np.float64, "y": np.float64})
+        self.ball_store = EntityStore({
+            "handle": np.int64, "x": np.float64, "y": np.float64, "prev_x": np.float64, "prev_y": np.float64,
+            "dx": np.float64, "dy": np.float64,
+        })
+
+        # Every alien/laser/ball of a kind has the same size
+        self.alien_size = layout.cell_width // 2
+        self.alien_speed = ALIEN_SPEED  # speed of a moving alien
+        self.laser_width, self.laser_height, self.laser_speed = 10, 5, 5
+        self.ball_radius = 10
+
+    def entity_counts(self):
+        return {
+            "aliens": len(self.alien_store),
+            "lasers": len(self.laser_store),
+            "balls": len(self.ball_store),
+            "towers": len(self.towers),
+        }
+
+    # -----------------------------------------------------------
+    # ALIENS: attack placed items, move, and check for game over
+    # -----------------------------------------------------------
+    def _update_aliens(self, dt):
+        store = self.alien_store
+        if not store.count:
+            return
+        rows, xs, size = store["row"], store["x"], self.alien_size
+
+        # Find which tower cell (if any) each alien overlaps; blue wins over
+        # black. Only the (at most two) cells each alien's x range covers are
+        # checked, read straight from the TowerGrid's type array.
+        towers = self.towers
+        target_cell = np.full(store.count, -1, dtype=np.int64)
+        if len(towers):
+            layout = self.layout
+            types = np.frombuffer(towers.types, dtype=np.int8)
+            target_type = np.zeros(store.count, dtype=np.int8)
+            first = np.floor_divide(xs - layout.grid_origin_x, layout.cell_width).astype(np.int64)
+            last = np.floor_divide(xs + size - layout.grid_origin_x, layout.cell_width).astype(np.int64)
+            for cols in (last, first):  # first column checked last so it wins ties
+                valid = (cols >= 0) & (cols < layout.num_columns)
+                cells = np.where(valid, rows * layout.num_columns + cols, 0)
+                px = layout.grid_origin_x + cols * layout.cell_width + (layout.cell_width - towers.tower_width) // 2
+                cell_type = np.where(valid, types[cells], TOWER_EMPTY)
+                hit = (cell_type != TOWER_EMPTY) & (xs < px + towers.tower_width) & (xs + size > px)
+                # A black hit never replaces a blue one
+                hit &= ~((cell_type == TOWER_BLACK) & (target_type == TOWER_BLUE))
+                target_cell[hit] = cells[hit]
+                target_type[hit] = cell_type[hit]
+
+        blocked = target_cell >= 0
+        target = np.where(blocked, np.frombuffer(towers.handles, dtype=np.int64)[np.maximum(target_cell, 0)], 0)
+        attack_timer = store["attack_timer"]
+
+        # Aliens that just reached a (new) tower hit it immediately
+        attack_timer[blocked & (store["target"] != target)] = 1250
+        store["target"][:] = target
+        attack_timer[blocked] += dt
+        hits = np.where(blocked, attack_timer // 1250, 0).astype(np.int64)
+        attack_timer[blocked] %= 1250
+        attack_timer[~blocked] = 0
+
+        # Apply the damage to each tower cell, removing destroyed towers
+        damaged = blocked & (hits > 0)
+        if damaged.any():
+            damage = np.bincount(target_cell[damaged], weights=hits[damaged])
+            for cell in np.flatnonzero(damage).tolist():
+                towers.damage(cell, int(damage[cell]))
+
+        # Movement and hit-flash decay, scaled to the tick length
+        scale = dt / BASE_TICK_MS
+        speed = store["speed"]
+        speed[:] = np.where(blocked, 0.0, self.alien_speed)
+        store["prev_x"][:] = xs
+        xs -= speed * scale
+        hit_timer = store["hit_timer"]
+        flashing = hit_timer > 0
+        hit_timer[flashing] -= scale
+        faded = flashing & (hit_timer <= 0)
+        hit_timer[faded] = 0
+        store["alpha"][faded] = 255
+
+        if not self.game_over and (xs <= 0).any():
+            self.game_over = True
+            self.game_over_time = self.time
+
+        # Remove aliens that have gone off screen
+        store.keep(xs + size >= 0)
+
+    def _spawn_aliens(self):
+        layout = self.layout
+        if self.alien_spawn_due and not self.game_over and self.spawning_active:
+            self.last_alien_spawn = self.time
+            self.timers.schedule(TIMER_ALIEN_SPAWN, self.time + self.spawn_interval)
+            random_row = self.rng.randint(0, layout.num_rows - 1)
+            store = self.alien_store
+
+            # The newest alien in a row is always the rightmost one
+            row_xs = store["x"][store["row"] == random_row]
+            if not len(row_xs) or row_xs.max() < layout.board_width - self.rng.randint(layout.cell_width, layout.cell_width * 3):
+                store.add(
+                    handle=self.handles.new(),
+                    row=random_row,
+                    x=layout.board_width,
+                    prev_x=layout.board_width,
+                    y=layout.grid_origin_y + random_row * layout.cell_height + (layout.cell_height // 4),
+                    speed=0.35, health=8, alpha=255, hit_timer=0,
+                )
+
+    # -----------------------------------------------------------
+    # LASERS: move, collide with aliens, fire from blue items
+    # -----------------------------------------------------------
+    def _update_lasers(self, dt):
+        lasers, aliens = self.laser_store, self.alien_store
+
+        lasers["prev_x"][:] = lasers["x"]
+        lasers["x"][:] += self.laser_speed * (dt / BASE_TICK_MS)
+
+        if lasers.count and aliens.count:
+            size = self.alien_size
+            laser_alive = np.ones(lasers.count, dtype=bool)
+            alien_hits = np.zeros(aliens.count, dtype=np.int64)
+            for row in np.unique(lasers["row"]):
+                laser_ids = np.flatnonzero(lasers["row"] == row)
+                alien_ids = np.flatnonzero(aliens["row"] == row)
+                if not len(alien_ids):
+                    continue
+                # Swept test: sort the lane's aliens by x and find, for every
+                # laser, the leftmost alien whose right edge is past where the
+                # laser started this tick; it's hit if the laser's sweep from
+                # prev_x to x reached its left edge (see Laser.contact_time)
+                alien_ids = alien_ids[np.argsort(aliens["x"][alien_ids], kind="stable")]
+                ax, apx, ay = aliens["x"][alien_ids], aliens["prev_x"][alien_ids], aliens["y"][alien_ids]
+                lx, lpx, ly = lasers["x"][laser_ids], lasers["prev_x"][laser_ids], lasers["y"][laser_ids]
+                candidate = np.searchsorted(ax + size, lpx, side="right")
+                in_lane = candidate < len(alien_ids)
+                candidate = np.minimum(candidate, len(alien_ids) - 1)
+                hit = (in_lane & (lpx < apx[candidate] + size) & (ax[candidate] < lx + self.laser_width) &
+                       (ly < ay[candidate] + size) & (ly + self.laser_height > ay[candidate]))
+                laser_alive[laser_ids[hit]] = False
+                np.add.at(alien_hits, alien_ids[candidate[hit]], 1)
+
+            was_hit = alien_hits > 0
+            aliens["health"][:] -= 2 * alien_hits  # laser deals 2 damage per hit
+            aliens["alpha"][was_hit] = 100
+            aliens["hit_timer"][was_hit] = 10
+            lasers.keep(laser_alive)
+            alive = aliens["health"] > 0
+            self.aliens_killed += int(aliens.count - alive.sum())
+            aliens.keep(alive)
+
+        # Drop lasers that left the board without hitting anything
+        lasers.keep(lasers["x"] <= self.layout.board_width)
+
+        # Shoot lasers from blue items
+        if self.due_towers and not self.game_over:
+            fired = []
+            self.towers.shoot_lasers(self.due_towers, fired, self.time)
+            for laser in fired:
+                lasers.add(handle=laser.handle, row=laser.row, x=laser.x, prev_x=laser.x, y=laser.y)
+            self.pools.lasers.release_all(fired)
+
+    # -----------------------------------------------------------
+    # FLOATING BALLS: spawn, move, and collect under the cursor
+    # -----------------------------------------------------------
+    def _update_balls(self, dt):
+        spawned = []
+        if self.ball_spawn_due and not self.game_over:
+            self.timers.schedule(TIMER_BALL_SPAWN, self.time + self.ball_spawn_interval)
+            if __debug__ and event_log.debug_enabled:
+                event_log.debug("spawn", "natural mineral spawned", sim_time=self.time)
+            ball = self.pools.balls.acquire(self.rng, self.layout.board_width, self.layout.board_height)
+            ball.handle = self.handles.new()
+            spawned.append(ball)
+        if self.due_towers and not self.game_over:
+            self.towers.spawn_balls(self.due_towers, spawned, self.time)
+
+        store = self.ball_store
+        for ball in spawned:
+            store.add(handle=ball.handle, x=ball.x, y=ball.y, prev_x=ball.x, prev_y=ball.y, dx=ball.dx, dy=ball.dy)
+        self.pools.balls.release_all(spawned)
+        if not store.count:
+            return
+
+        # Move the balls and bounce off edges
+        xs, ys, dxs, dys = store["x"], store["y"], store["dx"], store["dy"]
+        store["prev_x"][:] = xs
+        store["prev_y"][:] = ys
+        scale = dt / BASE_TICK_MS
+        xs += dxs * scale
+        ys += dys * scale
+        dxs[(xs < 0) | (xs > self.layout.board_width)] *= -1
+        dys[(ys < 0) | (ys > self.layout.board_height)] *= -1
+
+        # Collect every ball close to the mouse cursor
+        mx, my = self.pickup_pos
+        near = (xs - mx) ** 2 + (ys - my) ** 2 < BALL_PICKUP_RADIUS ** 2
+        collected = int(near.sum())
+        if collected:
+            self.player_money += 5 * collected
+            store.keep(~near)
+
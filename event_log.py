@@ -0,0 +1,164 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+# -----------------------------------------------------------
+# LEVELS
+# -----------------------------------------------------------
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "debug", INFO: "info", WARNING: "warning", ERROR: "error"}
+LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
+
+
+# -----------------------------------------------------------
+# CLASS: EventLog
+# Structured, leveled in-memory event log. Logging an event only
+# appends a tuple to a ring buffer (the last `capacity` events)
+# and a pending batch; a background thread writes the batch to
+# a JSON-lines file every flush_interval seconds, so the game
+# loop never blocks on stdout or disk.
+#
+# rate_limits maps a category to the most events per second it
+# may log; extra events are dropped and counted, and the next
+# event that gets through carries "suppressed": count.
+#
+# Debug events are compiled out: call sites guard them with
+#
+#   if __debug__ and event_log.debug_enabled:
+#       event_log.debug("spawn", "natural ball", time=now)
+#
+# which costs one attribute check above debug level and is
+# removed entirely when Python runs with -O.
+# -----------------------------------------------------------
+class EventLog:
+    def __init__(self, level=INFO, capacity=4096, rate_limits=None, flush_interval=0.5):
+        self.capacity = capacity
+        self.events = deque(maxlen=capacity)  # (time, level, category, message, fields)
+        self.rate_limits = dict(rate_limits or {})
+        self.flush_interval = flush_interval
+
+        self.buckets = {}  # category -> [tokens, last refill time]
+        self.suppressed = {}  # category -> events dropped since the last one logged
+
+        self.lock = threading.Lock()
+        self.pending = []
+        self.file = None
+        self.thread = None
+        self.wake = threading.Event()
+        self.stopping = False
+
+        self.set_level(level)
+
+    def set_level(self, level):
+        if isinstance(level, str):
+            level = LEVELS[level.lower()]
+        self.level = level
+        self.debug_enabled = level <= DEBUG
+
+    # -----------------------------------------------------------
+    # LOGGING
+    # -----------------------------------------------------------
+    def log(self, level, category, message, **fields):
+        if level < self.level:
+            return
+        limit = self.rate_limits.get(category)
+        if limit is not None and not self._take_token(category, limit):
+            self.suppressed[category] = self.suppressed.get(category, 0) + 1
+            return
+        dropped = self.suppressed.pop(category, 0)
+        if dropped:
+            fields["suppressed"] = dropped
+
+        event = (time.time(), level, category, message, fields)
+        self.events.append(event)
+        if self.file is not None:
+            with self.lock:
+                self.pending.append(event)
+
+    def debug(self, category, message, **fields):
+        self.log(DEBUG, category, message, **fields)
+
+    def info(self, category, message, **fields):
+        self.log(INFO, category, message, **fields)
+
+    def warning(self, category, message, **fields):
+        self.log(WARNING, category, message, **fields)
+
+    def error(self, category, message, **fields):
+        self.log(ERROR, category, message, **fields)
+
+    def _take_token(self, category, limit):
+        # Token bucket: refills at `limit` per second, holds at most `limit`
+        now = time.monotonic()
+        bucket = self.buckets.get(category)
+        if bucket is None:
+            bucket = self.buckets[category] = [limit, now]
+        tokens = min(limit, bucket[0] + (now - bucket[1]) * limit)
+        bucket[1] = now
+        if tokens < 1:
+            bucket[0] = tokens
+            return False
+        bucket[0] = tokens - 1
+        return True
+
+    def recent(self, count=None, category=None):
+        events = [e for e in self.events if category is None or e[2] == category]
+        return events if count is None else events[-count:]
+
+    # -----------------------------------------------------------
+    # FILE OUTPUT (background flush thread)
+    # -----------------------------------------------------------
+    def open(self, path):
+        # Starts writing events to path; events already in memory are written first
+        self.close()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, "a", encoding="utf-8")
+        with self.lock:
+            self.pending = list(self.events)
+        self.stopping = False
+        self.wake.clear()
+        self.thread = threading.Thread(target=self._flush_loop, name="event-log-flush", daemon=True)
+        self.thread.start()
+
+    def flush(self):
+        with self.lock:
+            batch, self.pending = self.pending, []
+        if not batch or self.file is None:
+            return
+        lines = []
+        for timestamp, level, category, message, fields in batch:
+            record = {"time": round(timestamp, 3), "level": LEVEL_NAMES.get(level, level), "category": category, "message": message}
+            record.update(fields)
+            lines.append(json.dumps(record, default=str))
+        self.file.write("\n".join(lines) + "\n")
+        self.file.flush()
+
+    def _flush_loop(self):
+        while not self.stopping:
+            self.wake.wait(self.flush_interval)
+            self.flush()
+
+    def close(self):
+        if self.thread is not None:
+            self.stopping = True
+            self.wake.set()
+            self.thread.join()
+            self.thread = None
+        if self.file is not None:
+            self.flush()
+            self.file.close()
+            self.file = None
+
+
+# Shared log used by the game; rate limits keep per-spawn events
+# from flooding the file in long sessions
+event_log = EventLog(rate_limits={"spawn": 20, "menu": 5})
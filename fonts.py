@@ -0,0 +1,82 @@
+import os
+from collections import OrderedDict
+
+import pygame
+
+
+FONT_DIR = os.path.join(os.path.dirname(__file__), "assets", "Font")
+
+
+# -----------------------------------------------------------
+# CLASS: FontService
+# Loads fonts by file path once and hands out the same Font
+# object afterwards. Names are files in assets/Font; None is
+# pygame's own bundled default font. Nothing here scans the
+# system font list (unlike pygame.font.SysFont).
+# -----------------------------------------------------------
+class FontService:
+    def __init__(self, font_dir=FONT_DIR):
+        self.font_dir = font_dir
+        self.fonts = {}
+
+    def get(self, name, size):
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            path = os.path.join(self.font_dir, name) if name is not None else None
+            font = pygame.font.Font(path, size)
+            self.fonts[key] = font
+        return font
+
+
+# -----------------------------------------------------------
+# CLASS: TextCache
+# Cache of rendered text surfaces keyed by (font, text, color,
+# antialias). Least recently used entries are evicted once
+# max_size is reached.
+# -----------------------------------------------------------
+class TextCache:
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, color, antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+# -----------------------------------------------------------
+# CLASS: TextLabel
+# A HUD text widget that only re-renders when its value
+# changes, e.g. the money counter.
+# -----------------------------------------------------------
+class TextLabel:
+    def __init__(self, font, color, antialias=True):
+        self.font = font
+        self.color = color
+        self.antialias = antialias
+        self.value = None
+        self.surface = None
+
+    def render(self, value):
+        if self.surface is None or value != self.value:
+            self.value = value
+            self.surface = self.font.render(f"{value}", self.antialias, self.color)
+        return self.surface
+
+
+# Shared by the renderer and the menu
+fonts = FontService()
+text_cache = TextCache()
@@ -0,0 +1,89 @@
+# -----------------------------------------------------------
+# SCREEN SIZE
+# Size of the game window in pixels.
+# -----------------------------------------------------------
+SCREEN_WIDTH, SCREEN_HEIGHT = 1280, 720
+
+
+# -----------------------------------------------------------
+# CLASS: GridLayout
+# Geometry of the play area (9x5 grid by default) and the
+# margins around it. Shared by the simulation and the renderer.
+#
+# By default the grid is fitted to the window. With cell_size
+# (width, height) every cell has that size instead, and the
+# board (the grid plus its margins, board_width x board_height)
+# can be much larger than the window; the Camera (camera.py)
+# scrolls over it. Everything in the simulation is positioned
+# in board coordinates, which match window coordinates for the
+# default layout.
+# -----------------------------------------------------------
+class GridLayout:
+    def __init__(self, num_columns=9, num_rows=5, screen_width=SCREEN_WIDTH, screen_height=SCREEN_HEIGHT, cell_size=None):
+        self.num_columns = num_columns
+        self.num_rows = num_rows
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.cell_size = cell_size
+
+        self.grid_origin_y = 170
+        margin_bottom = screen_height - (self.grid_origin_y + 530)
+        self.margin_sides = margin_bottom
+        self.grid_origin_x = self.margin_sides
+
+        if cell_size is None:
+            self.grid_width = screen_width - 2 * self.margin_sides
+            self.grid_height = 530
+            self.cell_width = self.grid_width // num_columns
+            self.cell_height = self.grid_height // num_rows
+        else:
+            self.cell_width, self.cell_height = cell_size
+            self.grid_width = num_columns * self.cell_width
+            self.grid_height = num_rows * self.cell_height
+
+        # Board size: aliens enter at the right edge, lasers leave
+        # there, and balls bounce inside it
+        self.board_width = self.grid_origin_x + self.grid_width + self.margin_sides
+        self.board_height = self.grid_origin_y + self.grid_height + margin_bottom
+
+        # Money display box, to the right of the item panel
+        self.money_box_width = 120
+        self.money_box_x = self.margin_sides + 550 + 20
+
+    def signature(self):
+        # Changes whenever anything that affects the static background changes
+        return (self.num_columns, self.num_rows, self.screen_width, self.screen_height,
+                self.grid_origin_x, self.grid_origin_y, self.grid_width, self.grid_height,
+                self.cell_width, self.cell_height)
+
+    def grid_args(self):
+        # Positional arguments expected by PlaceableItem.stop_drag / preview_position
+        return (self.grid_origin_x, self.grid_origin_y, self.cell_width, self.cell_height,
+                self.num_columns, self.num_rows)
+
+    def config(self):
+        # (columns, rows, cell width, cell height) for snapshots and
+        # recordings; the cell size is 0 x 0 for a grid fitted to the window
+        cell_width, cell_height = self.cell_size or (0, 0)
+        return self.num_columns, self.num_rows, cell_width, cell_height
+
+    def cells_in(self, left, top, right, bottom):
+        # (rows, cols) ranges of the cells overlapping a board-space box
+        first_col = max(0, int((left - self.grid_origin_x) // self.cell_width))
+        last_col = min(self.num_columns - 1, int((right - self.grid_origin_x) // self.cell_width))
+        first_row = max(0, int((top - self.grid_origin_y) // self.cell_height))
+        last_row = min(self.num_rows - 1, int((bottom - self.grid_origin_y) // self.cell_height))
+        return range(first_row, last_row + 1), range(first_col, last_col + 1)
+
+
+# Cell size of the default grid, for boards with a fixed cell size
+DEFAULT_CELL_SIZE = (GridLayout().cell_width, GridLayout().cell_height)
+
+
+# -----------------------------------------------------------
+# FUNCTION: layout_from_config
+# Rebuilds a GridLayout from the tuple GridLayout.config() gives.
+# -----------------------------------------------------------
+def layout_from_config(num_columns, num_rows, cell_width, cell_height):
+    cell_size = (cell_width, cell_height) if cell_width else None
+    return GridLayout(num_columns, num_rows, cell_size=cell_size)
@@ -1,541 +1,337 @@
-import pygame
-import random
-import math
-
-# -----------------------------------------------------------
-# INITIAL SETUP
-# Initializes the game window, screen, and clock.
-# -----------------------------------------------------------
-pygame.display.set_caption("Scientists vs. Aliens")
-
-SCREEN_WIDTH, SCREEN_HEIGHT = 1280, 720
-
-# -----------------------------------------------------------
-# FUNCTION: draw_rounded_rect
-# Simple helper function to draw rectangles with rounded corners.
-# -----------------------------------------------------------
-def draw_rounded_rect(surface, color, rect, radius):
-    pygame.draw.rect(surface, color, pygame.Rect(rect), border_radius=radius)
-
-
-# -----------------------------------------------------------
-# CLASS: Alien
-# Represents one alien moving horizontally across a grid row.
-# -----------------------------------------------------------
-class Alien:
-    def __init__(self, row, cell_width, cell_height, grid_origin_x, grid_origin_y):
-        self.row = row
-        self.x = SCREEN_WIDTH
-        self.y = grid_origin_y + row * cell_height + (cell_height // 4)
-        self.width = cell_width // 2
-        self.height = self.width
-        self.speed = 0.35  # movement speed (slower for balance)
-        self.health = 8  # takes 4 shots to die (since laser deals 2 damage)
-        self.alpha = 255  # full opacity
-        self.hit_timer = 0  # frames remaining for see-through effect
-
-    def update(self):
-        self.x -= self.speed  # move left every frame
-        if self.hit_timer > 0:
-            self.hit_timer -= 1
-            if self.hit_timer == 0:
-                self.alpha = 255  # restore full opacity
-
-    def draw(self, surface):
-        alien_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        pygame.draw.rect(alien_surface, (0, 255, 0, self.alpha), (0, 0, self.width, self.height))
-        surface.blit(alien_surface, (self.x, self.y))
-
-    def hit(self):
-        self.health -= 2  # laser deals 2 damage per hit
-        self.alpha = 100  # see-through
-        self.hit_timer = 10  # frames to stay see-through
-
-    def is_off_screen(self):
-        return self.x + self.width < 0  # if alien is completely off screen
+import argparse
+import time
 
+import pygame
 
-# -----------------------------------------------------------
-# CLASS: FloatingBall
-# Floating balls that wander around and give money when clicked.
-# -----------------------------------------------------------
-class FloatingBall:
-    def __init__(self):
-        self.x = random.randint(100, SCREEN_WIDTH - 100)
-        self.y = random.randint(200, SCREEN_HEIGHT - 100)
-        self.radius = 10
-        self.dx = random.uniform(-0.5, 0.5)
-        self.dy = random.uniform(-0.5, 0.5)
-
-    def update(self):
-        # Move the ball and bounce off edges
-        self.x += self.dx
-        self.y += self.dy
-        if self.x < 0 or self.x > SCREEN_WIDTH:
-            self.dx *= -1
-        if self.y < 0 or self.y > SCREEN_HEIGHT:
-            self.dy *= -1
-
-    def draw(self, surface):
-        pygame.draw.circle(surface, (0, 255, 255), (int(self.x), int(self.y)), self.radius)
-
-    def is_near_mouse(self, mouse_pos):
-        dist = math.hypot(self.x - mouse_pos[0], self.y - mouse_pos[1])
-        return dist < 30
+from camera import Camera, ZOOM_STEP
+from layout import GridLayout, DEFAULT_CELL_SIZE
+from simulation import Simulation, TickInput, INPUT_MOUSE_DOWN, INPUT_MOUSE_UP, SEED_LIMIT
+from renderer import Renderer
+from recording import InputRecorder, MAX_RECORDED_BOARD
+import snapshot
+from profiler import FrameProfiler
+from quality import QualityGovernor, quality_levels, MIN_RENDER_SCALE
+from event_log import event_log
+from scenes import App, Scene, GameOverScene
+from timestep import FixedTimestep
+from render_state import capture_render_state
+from sim_thread import SimThread
 
 
 # -----------------------------------------------------------
-# CLASS: Laser
-# Represents a laser shot from blue items towards aliens.
+# FUNCTION: read_inputs
+# Turns this frame's pygame events into a TickInput.
+# Key presses go to on_key(key) and mouse wheel notches to
+# on_wheel(notches) if given; the wheel never counts as a click.
 # -----------------------------------------------------------
+WHEEL_BUTTONS = (4, 5)
 
 
-class Laser:
-    def __init__(self, x, y, row):
-        self.x = x
-        self.y = y
-        self.row = row
-        self.width = 10
-        self.height = 5
-        self.speed = 5  # move right
-
-    def update(self):
-        self.x += self.speed
-
-    def draw(self, surface):
-        pygame.draw.rect(surface, (255, 0, 0), (self.x, self.y, self.width, self.height))
-
-    def is_off_screen(self):
-        return self.x > SCREEN_WIDTH
-
-    def collides_with(self, alien):
-        return (self.x < alien.x + alien.width and
-                self.x + self.width > alien.x and
-                self.y < alien.y + alien.height and
-                self.y + self.height > alien.y)
+def read_inputs(events, on_key=None, on_wheel=None):
+    buttons = []
+    for event in events:
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button not in WHEEL_BUTTONS:
+            buttons.append(INPUT_MOUSE_DOWN)
+        elif event.type == pygame.MOUSEBUTTONUP and event.button not in WHEEL_BUTTONS:
+            buttons.append(INPUT_MOUSE_UP)
+        elif event.type == pygame.KEYDOWN and on_key is not None:
+            on_key(event.key)
+        elif event.type == pygame.MOUSEWHEEL and on_wheel is not None:
+            on_wheel(event.y)
+    return TickInput(pygame.mouse.get_pos(), buttons)
 
 
 # -----------------------------------------------------------
-# CLASS: PlaceableItem
-# Represents a draggable item (like towers) that can be placed
-# onto grid cells and optionally spawn objects over time.
+# CLASS: GameScene
+# One game, from a fresh Simulation to game over. Handles:
+# - Reading player input
+# - Stepping the simulation at a fixed rate (sim_hz), however
+#   fast frames are drawn; with threaded=True on a SimThread,
+#   so ticks overlap with drawing and presenting
+# - Drawing the current state, interpolated between ticks
+# - Optionally recording every tick's input for replay
+# - The frame profiler (F3 overlay, F11 record, F12 trace)
+# - Render quality: render_scale sets the internal resolution
+#   (1 = window size); with adaptive_quality a QualityGovernor
+#   lowers effects and resolution while frames take longer to
+#   produce than the frame cap allows, and raises them again
+#   once there is room
+# - The camera: arrow keys scroll, the mouse wheel zooms at the
+#   cursor and Home resets the view. The board can be larger
+#   than the window (layout, see GridLayout); the simulation
+#   runs all of it and sees the cursor in board coordinates
+#   (see Camera.pickup_pos for the HUD band).
+# - Snapshots: F5 quicksaves to QUICKSAVE_PATH and F9 loads it
+#   back. With rewind=True Backspace rewinds about half a second
+#   per press; that dumps a snapshot every half second, which
+#   takes milliseconds on big boards, so it is opt-in. Rewind and
+#   load are off while recording, since a recording must be one
+#   unbroken run from the seed.
+# Escape leaves the game; after game over it is replaced by
+# the GameOverScene. resume_path starts from a saved snapshot.
 # -----------------------------------------------------------
-class PlaceableItem:
-    def __init__(self, x, y, width, height, item_type="blue"):
-        self.original_x = x
-        self.original_y = y
-        self.x = x
-        self.y = y
-        self.width = width
-        self.height = height
-        self.dragging = False
-        self.placed_items = []   # list of placed positions
-        self.type = item_type
-        self.spawn_timers = []   # timers for spawned objects
-        self.shoot_timers = []   # timers for shooting lasers (blue only)
-        self.object_health = []  # health for each placed object
-
-    def start_drag(self):
-        self.dragging = True
-
-    def stop_drag(self, grid_origin_x, grid_origin_y, cell_width, cell_height, num_columns, num_rows, player_money):
-        self.dragging = False
-
-        # Determine which grid cell the item was dropped into
-        col = (self.x - grid_origin_x + self.width // 2) // cell_width
-        row = (self.y - grid_origin_y + self.height // 2) // cell_height
-
-        # Clamp to valid grid indices
-        col = max(0, min(num_columns - 1, col))
-        row = max(0, min(num_rows - 1, row))
-
-        # Snap position to grid
-        snap_x = grid_origin_x + col * cell_width + (cell_width - self.width) // 2
-        snap_y = grid_origin_y + row * cell_height + (cell_height - self.height) // 2
-
-        # Only place if the player has enough money
-        cost = 15 if self.type == "blue" else 15  # blue: 15, black: 15
-        if player_money >= cost:
-            self.placed_items.append((snap_x, snap_y))
-            self.spawn_timers.append(0)
-            self.shoot_timers.append(0)
-            self.object_health.append(6 if self.type == "blue" else 5)  # blue: 6 hits, black: 5 hits
-            player_money -= cost
-
-        # Return item back to original place
-        self.x = self.original_x
-        self.y = self.original_y
-
-        return player_money
-
-    def update_position(self, mouse_pos):
-        if self.dragging:
-            self.x = mouse_pos[0] - self.width // 2
-            self.y = mouse_pos[1] - self.height // 2
-
-    def draw(self, surface):
-        color = (0, 0, 255) if self.type == "blue" else (0, 0, 0)
-        pygame.draw.rect(surface, color, (self.x, self.y, self.width, self.height))
-        for idx, (px, py) in enumerate(self.placed_items):
-            pygame.draw.rect(surface, color, (px, py, self.width, self.height))
-            # Draw health bar
-            health = self.object_health[idx] if idx < len(self.object_health) else 0
-            if health < 4:
-                bar_width = int(self.width * (health / 4))
-                pygame.draw.rect(surface, (255, 0, 0), (px, py - 8, bar_width, 5))
-
-    def draw_preview(self, surface, grid_origin_x, grid_origin_y, cell_width, cell_height, num_columns, num_rows):
-        if self.dragging:
-            # Preview which cell the item would land in
-            col = (self.x - grid_origin_x + self.width // 2) // cell_width
-            row = (self.y - grid_origin_y + self.height // 2) // cell_height
-
-            col = max(0, min(num_columns - 1, col))
-            row = max(0, min(num_rows - 1, row))
-
-            snap_x = grid_origin_x + col * cell_width + (cell_width - self.width) // 2
-            snap_y = grid_origin_y + row * cell_height + (cell_height - self.height) // 2
-
-            preview_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-            preview_surface.fill((0, 0, 255, 100) if self.type == "blue" else (0, 0, 0, 100))
-            surface.blit(preview_surface, (snap_x, snap_y))
-
-
-
-# AlienAttackState must be outside PlaceableItem
-class AlienAttackState:
-    def __init__(self):
-        self.target_idx = None
-        self.attack_timer = 0
-
-# Move these methods back into PlaceableItem
-
-def spawn_ball_if_needed(self, dt, balls):
-    if self.type != "black":
-        return
-    for i in range(len(self.spawn_timers)):
-        self.spawn_timers[i] += dt
-        if self.spawn_timers[i] >= 6500:  # 5.25s + 1.25s = 6.5s
-            self.spawn_timers[i] = 0
-            px, py = self.placed_items[i]
-            ball = FloatingBall()
-            ball.x = px + self.width // 2
-            ball.y = py + self.height // 2
-            print(f"[DEBUG] Black item mineral spawned at {pygame.time.get_ticks()} ms from ({px},{py})")
-            balls.append(ball)
-PlaceableItem.spawn_ball_if_needed = spawn_ball_if_needed
-
-def shoot_lasers_if_needed(self, dt, lasers, grid_origin_y, cell_height):
-    if self.type != "blue":
-        return
-    for i in range(len(self.shoot_timers)):
-        self.shoot_timers[i] += dt
-        if self.shoot_timers[i] >= 2000:  # fire every 2s (slower)
-            self.shoot_timers[i] = 0
-            px, py = self.placed_items[i]
-            row = (py - grid_origin_y) // cell_height
-            laser = Laser(px + self.width, py + self.height // 2 - 2.5, row)
-            lasers.append(laser)
-PlaceableItem.shoot_lasers_if_needed = shoot_lasers_if_needed
+QUICKSAVE_PATH = "quicksave.svas"
+SCROLL_SPEED = 1000  # window px per second while an arrow key is held
+
+
+class GameScene(Scene):
+    def __init__(self, app, seed=None, record_path=None, profile=False, sim_hz=60, resume_path=None, threaded=False,
+                 render_scale=1.0, adaptive_quality=False, layout=None, rewind=False):
+        super().__init__(app)
+        start = time.perf_counter()
+        self.sim = snapshot.load(resume_path) if resume_path else Simulation(layout, seed=seed)
+        self.camera = Camera(self.sim.layout, *app.screen.get_size())
+        self.view = self.camera.view_rect()  # board area the sim thread captures
+        self.rewind = snapshot.RewindBuffer(interval=max(1, round(sim_hz / 2))) if rewind else None
+        self.pending_buttons = []  # clicks waiting for the next tick
+        levels = quality_levels(render_scale)
+        self.renderer = Renderer(app.screen, self.sim, levels[0], self.camera)
+        self.governor = QualityGovernor(levels, budget_ms=1000 / (app.fps or 60)) if adaptive_quality else None
+        self.frame_start = None
+        self.redraw_all = False  # set by restored(), which may run on the sim thread
+        self.recorder = InputRecorder(record_path, self.sim.seed, self.sim.layout) if record_path else None
+        if threaded:
+            # From here on only the sim thread touches self.sim
+            self.sim_thread = SimThread(self.tick, lambda: capture_render_state(self.sim, self.view), sim_hz)
+            self.timestep = self.sim_thread.timestep
+            self.profiler = FrameProfiler(self.sim_thread, self.renderer)
+        else:
+            self.sim_thread = None
+            self.timestep = FixedTimestep(sim_hz)
+            self.profiler = FrameProfiler(self.sim, self.renderer)
+        self.profiler.set_enabled(profile)
+        event_log.info("game", "started", seed=self.sim.seed, setup_ms=round((time.perf_counter() - start) * 1000, 3))
+
+    def enter(self):
+        # Whatever was on screen before is stale
+        self.renderer.compositor.invalidate()
+        if self.sim_thread is not None:
+            self.sim_thread.start()
+
+    def exit(self):
+        if self.sim_thread is not None:
+            self.sim_thread.stop()
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+        sim = self.sim
+        event_log.info("game", "ended", sim_time=sim.time, money=sim.player_money, game_over=sim.game_over)
+
+    def on_key(self, key):
+        if self.profiler.handle_key(key):
+            return
+        if key == pygame.K_ESCAPE:
+            self.app.pop()
+        elif key == pygame.K_HOME:
+            self.camera.reset()
+        elif key == pygame.K_F5:
+            self.on_sim(self.quicksave)
+        elif self.recorder is not None:
+            return
+        elif key == pygame.K_BACKSPACE:
+            if self.rewind is not None:
+                self.on_sim(self.rewind_once)
+        elif key == pygame.K_F9:
+            self.on_sim(self.quickload)
+
+    def on_sim(self, fn):
+        # Runs fn wherever the simulation lives (between its ticks)
+        if self.sim_thread is not None:
+            self.sim_thread.call(fn)
+        else:
+            fn()
+
+    # -----------------------------------------------------------
+    # SIM SIDE: called between ticks, on the sim thread if any
+    # -----------------------------------------------------------
+    def tick(self, step_ms, tick_input):
+        if self.recorder is not None:
+            self.recorder.record(step_ms, tick_input)
+        self.sim.step(step_ms, tick_input)
+        if self.rewind is not None:
+            self.rewind.capture(self.sim)
+
+    def quicksave(self):
+        snapshot.save(self.sim, QUICKSAVE_PATH)
+        event_log.info("game", "saved", path=QUICKSAVE_PATH, tick=self.sim.ticks)
+
+    def rewind_once(self):
+        if self.rewind.rewind(self.sim) is not None:
+            self.restored()
+
+    def quickload(self):
+        try:
+            snapshot.load(QUICKSAVE_PATH, self.sim)
+        except (OSError, ValueError) as e:
+            event_log.warning("game", "load failed", path=QUICKSAVE_PATH, error=str(e))
+        else:
+            if self.rewind is not None:
+                self.rewind.clear()
+            self.restored()
+
+    def restored(self):
+        # The sim jumped in time: drop queued clicks and redraw everything
+        # (on the render thread, in draw())
+        self.timestep.reset()
+        if self.sim_thread is not None:
+            self.sim_thread.drop_input()
+        else:
+            self.pending_buttons = []
+        self.redraw_all = True
+        event_log.info("game", "restored", tick=self.sim.ticks, sim_time=self.sim.time)
+
+    # -----------------------------------------------------------
+    # RENDER SIDE: once per frame
+    # -----------------------------------------------------------
+    def on_wheel(self, notches):
+        self.camera.zoom_at(ZOOM_STEP ** notches, pygame.mouse.get_pos())
+
+    def update(self, dt, events):
+        self.frame_start = time.perf_counter()
+        self.profiler.begin_frame()
+        inputs = read_inputs(events, self.on_key, self.on_wheel)
+        if self.app.scene is not self:
+            return
+
+        keys = pygame.key.get_pressed()
+        dx = keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]
+        dy = keys[pygame.K_DOWN] - keys[pygame.K_UP]
+        if dx or dy:
+            step = SCROLL_SPEED * dt / 1000
+            self.camera.scroll(dx * step, dy * step)
+        self.view = self.camera.view_rect()
+        pickup_pos = self.camera.pickup_pos(inputs.mouse_pos)
+        mouse_pos = self.camera.to_world(inputs.mouse_pos)
+
+        if self.sim_thread is not None:
+            self.sim_thread.check()
+            self.sim_thread.submit(mouse_pos, inputs.buttons, pickup_pos)
+            return
+
+        # Frames with no tick keep their clicks for the next one
+        self.pending_buttons.extend(inputs.buttons)
+        step_ms = self.timestep.step_ms
+        for _ in range(self.timestep.advance(dt)):
+            tick_input = TickInput(mouse_pos, self.pending_buttons, pickup_pos)
+            self.pending_buttons = []
+            self.tick(step_ms, tick_input)
+
+    def draw(self):
+        if self.redraw_all:
+            self.redraw_all = False
+            self.renderer.compositor.invalidate()
+        if self.sim_thread is not None:
+            state, alpha = self.sim_thread.latest()
+            self.renderer.draw_state(state, alpha)
+            finished = state.finished
+        else:
+            self.renderer.draw(self.timestep.alpha)
+            finished = self.sim.finished
+        self.profiler.draw_overlay(self.app.screen)
+        self.renderer.present()
+        self.profiler.end_frame()
+        if self.governor is not None and self.frame_start is not None:
+            # Work time only: the frame cap's sleep happens after this
+            level = self.governor.record((time.perf_counter() - self.frame_start) * 1000)
+            if level is not None:
+                self.renderer.set_quality(level)
+        if finished:
+            self.app.replace(GameOverScene(self.app, self.sim))
 
 
 # -----------------------------------------------------------
-# MAIN GAME LOOP
-# Handles:
-# - Game initialization
-# - Drawing UI
-# - Alien spawning cycles
-# - Money collection
-# - Player input and dragging
+# FUNCTION: main
+# Starts straight into a game (menu.py starts at the menu).
+# Optionally writes the event log to a file. fps caps the
+# render rate (0 = uncapped); sim_hz is the simulation rate.
 # -----------------------------------------------------------
-def main():
-    pygame.init()
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    clock = pygame.time.Clock()
-    running = True
-
-    # Grid parameters (9x5 play area)
-    NUM_COLUMNS, NUM_ROWS = 9, 5
-    GRID_ORIGIN_Y = 170
-    GRID_HEIGHT = 530
-    margin_bottom = SCREEN_HEIGHT - (GRID_ORIGIN_Y + GRID_HEIGHT)
-    margin_sides = margin_bottom
-    GRID_ORIGIN_X = margin_sides
-    GRID_WIDTH = SCREEN_WIDTH - 2 * margin_sides
-
-    CELL_WIDTH = GRID_WIDTH // NUM_COLUMNS
-    CELL_HEIGHT = GRID_HEIGHT // NUM_ROWS
-
-    # Each row stores a list of active aliens in that lane
-    aliens_by_row = [[] for _ in range(NUM_ROWS)]
-
-    spawn_timer = 0
-    spawn_interval = 500
-    spawn_cycle_timer = 0
-    spawn_phase_duration = 2000
-    break_phase_duration = 6000
-    spawning_active = False
-    alien_spawn_delay = 11000  # 11 seconds
-
-    # Draggable item buttons
-    item_blue = PlaceableItem(margin_sides + 20, 40, CELL_WIDTH // 2, CELL_HEIGHT // 2, "blue")
-    item_black = PlaceableItem(margin_sides + 120, 40, CELL_WIDTH // 2, CELL_HEIGHT // 2, "black")
-
-    # Player starting money
-    player_money = 0
-
-    # Fonts
-    font = pygame.font.SysFont(None, 48)
-    small_font = pygame.font.SysFont(None, 24)
-
-    # Ball spawning system
-    balls = []
-    ball_spawn_timer = 4750  # Start at interval so first mineral spawns instantly
-    ball_spawn_interval = 4750  # 3s + 0.5s = 3.5s
-
-    # Laser system
-    lasers = []
-
-    game_started = True
-    game_over = False
-    game_over_time = 0
-
-    while running:
-        dt = clock.tick(60)
-        current_time = pygame.time.get_ticks()
-
-        spawn_timer += dt
-        spawn_cycle_timer += dt
-        ball_spawn_timer += dt
-
-        if current_time >= alien_spawn_delay:
-            if spawn_cycle_timer >= (spawn_phase_duration if spawning_active else break_phase_duration):
-                spawn_cycle_timer = 0
-                spawning_active = not spawning_active
-
-        # -----------------------------------------------------------
-        # EVENT HANDLING: mouse input and dragging logic
-        # -----------------------------------------------------------
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_x, mouse_y = pygame.mouse.get_pos()
-                if item_blue.x <= mouse_x <= item_blue.x + item_blue.width and item_blue.y <= mouse_y <= item_blue.y + item_blue.height:
-                    item_blue.start_drag()
-                elif item_black.x <= mouse_x <= item_black.x + item_black.width and item_black.y <= mouse_y <= item_black.y + item_black.height:
-                    item_black.start_drag()
-
-            elif event.type == pygame.MOUSEBUTTONUP:
-                if item_blue.dragging:
-                    player_money = item_blue.stop_drag(GRID_ORIGIN_X, GRID_ORIGIN_Y, CELL_WIDTH, CELL_HEIGHT, NUM_COLUMNS, NUM_ROWS, player_money)
-                if item_black.dragging:
-                    player_money = item_black.stop_drag(GRID_ORIGIN_X, GRID_ORIGIN_Y, CELL_WIDTH, CELL_HEIGHT, NUM_COLUMNS, NUM_ROWS, player_money)
-
-        mouse_pos = pygame.mouse.get_pos()
-        item_blue.update_position(mouse_pos)
-        item_black.update_position(mouse_pos)
-
-        # -----------------------------------------------------------
-        # DRAW BACKGROUND AND GRID
-        # -----------------------------------------------------------
-        screen.fill((0, 0, 0))##################
-        draw_rounded_rect(screen, "#2C363F", (GRID_ORIGIN_X, GRID_ORIGIN_Y, GRID_WIDTH, GRID_HEIGHT), radius=5)
-
-        # Draw grid cells
-        for row in range(NUM_ROWS):
-            for col in range(NUM_COLUMNS):
-                cell_color = "#333333" if (row + col) % 2 == 0 else "#535657"
-                draw_rounded_rect(
-                    screen,
-                    cell_color,
-                    (
-                        GRID_ORIGIN_X + col * CELL_WIDTH,
-                        GRID_ORIGIN_Y + row * CELL_HEIGHT,
-                        CELL_WIDTH + 7,
-                        CELL_HEIGHT
-                    ),
-                    radius=5
-                )
-#######################
-        # -----------------------------------------------------------
-        # TOP UI BAR (item buttons + money display)
-        # -----------------------------------------------------------
-        draw_rounded_rect(screen, "#2F3061", (margin_sides, 12.5, 550, 145), radius=10) ############################
-        money_box_width = 120
-        money_box_x = margin_sides + 550 + 20
-        draw_rounded_rect(screen, "#2F3061", (money_box_x, 12.5, money_box_width, 145), radius=10)
-
-        money_text = font.render(f"{player_money}", True, (255, 255, 255))
-        text_rect = money_text.get_rect(center=(money_box_x + money_box_width // 2, 12.5 + 145 // 2))
-        screen.blit(money_text, text_rect)
-########################
-        item_blue.draw_preview(screen, GRID_ORIGIN_X, GRID_ORIGIN_Y, CELL_WIDTH, CELL_HEIGHT, NUM_COLUMNS, NUM_ROWS)
-        item_black.draw_preview(screen, GRID_ORIGIN_X, GRID_ORIGIN_Y, CELL_WIDTH, CELL_HEIGHT, NUM_COLUMNS, NUM_ROWS)
-        item_blue.draw(screen)
-        item_black.draw(screen)
-
-        # Draw lasers
-        for laser in lasers:
-            laser.draw(screen)
-
-        # Prices under each item
-        cost_text_blue = small_font.render("15", True, (255, 255, 255))
-        cost_rect_blue = cost_text_blue.get_rect(center=(item_blue.x + item_blue.width // 2, item_blue.y + item_blue.height + 12))
-        screen.blit(cost_text_blue, cost_rect_blue)
-
-        cost_text_black = small_font.render("15", True, (255, 255, 255))
-        cost_rect_black = cost_text_black.get_rect(center=(item_black.x + item_black.width // 2, item_black.y + item_black.height + 12))
-        screen.blit(cost_text_black, cost_rect_black)
-
-        # -----------------------------------------------------------
-        # UPDATE AND DRAW ALIENS
-        # -----------------------------------------------------------
-        # Alien attack logic
-        if not hasattr(main, 'alien_attack_states'):
-            main.alien_attack_states = [{} for _ in range(NUM_ROWS)]
-        for row in range(NUM_ROWS):
-            row_aliens = aliens_by_row[row]
-            attack_states = main.alien_attack_states[row]
-            for i, a in enumerate(row_aliens):
-                # Find collision with any placed object (blue or black) in this row
-                hit_type = None
-                hit_idx = None
-                # Check blue items
-                for idx, (px, py) in enumerate(item_blue.placed_items):
-                    if a.y < py + item_blue.height and a.y + a.height > py and a.x < px + item_blue.width and a.x + a.width > px:
-                        hit_type = 'blue'
-                        hit_idx = idx
-                        break
-                # If no blue, check black
-                if hit_idx is None:
-                    for idx, (px, py) in enumerate(item_black.placed_items):
-                        if a.y < py + item_black.height and a.y + a.height > py and a.x < px + item_black.width and a.x + a.width > px:
-                            hit_type = 'black'
-                            hit_idx = idx
-                            break
-                if hit_idx is not None:
-                    # Stop alien and attack
-                    if i not in attack_states:
-                        attack_states[i] = AlienAttackState()
-                        attack_states[i].target_idx = hit_idx
-                        attack_states[i].attack_timer = 1250  # force immediate damage
-                        attack_states[i].target_type = hit_type
-                    a.speed = 0
-                    state = attack_states[i]
-                    state.attack_timer += dt
-                    while state.attack_timer >= 1250:
-                        state.attack_timer -= 1250
-                        # Damage correct object
-                        if state.target_type == 'blue' and hit_idx < len(item_blue.object_health):
-                            item_blue.object_health[hit_idx] -= 1
-                            if item_blue.object_health[hit_idx] <= 0:
-                                del item_blue.placed_items[hit_idx]
-                                del item_blue.spawn_timers[hit_idx]
-                                del item_blue.shoot_timers[hit_idx]
-                                del item_blue.object_health[hit_idx]
-                                for st in attack_states.values():
-                                    if getattr(st, 'target_type', None) == 'blue' and st.target_idx == hit_idx:
-                                        st.target_idx = None
-                        elif state.target_type == 'black' and hit_idx < len(item_black.object_health):
-                            item_black.object_health[hit_idx] -= 1
-                            if item_black.object_health[hit_idx] <= 0:
-                                del item_black.placed_items[hit_idx]
-                                del item_black.spawn_timers[hit_idx]
-                                del item_black.shoot_timers[hit_idx]
-                                del item_black.object_health[hit_idx]
-                                for st in attack_states.values():
-                                    if getattr(st, 'target_type', None) == 'black' and st.target_idx == hit_idx:
-                                        st.target_idx = None
-                    a.speed = 0
-                else:
-                    # Resume movement
-                    a.speed = getattr(a, 'default_speed', 0.45)
-                    if i in attack_states:
-                        del attack_states[i]
-                a.update()
-                if a.x <= 0:
-                    game_over = True
-                    if game_over_time == 0:
-                        game_over_time = pygame.time.get_ticks()
-                if not game_over:
-                    a.draw(screen)
-            # Remove aliens that have gone off screen
-            aliens_by_row[row] = [a for a in row_aliens if not a.is_off_screen()]
-
-        # Spawn a new alien periodically while active
-        if not game_over and spawning_active and spawn_timer >= spawn_interval:
-            spawn_timer = 0
-            random_row = random.randint(0, NUM_ROWS - 1)
-            row_aliens = aliens_by_row[random_row]
-
-            if not row_aliens or row_aliens[-1].x < SCREEN_WIDTH - random.randint(CELL_WIDTH, CELL_WIDTH * 3):
-                aliens_by_row[random_row].append(
-                    Alien(random_row, CELL_WIDTH, CELL_HEIGHT, GRID_ORIGIN_X, GRID_ORIGIN_Y)
-                )
-
-        # -----------------------------------------------------------
-        # LASER SHOOTING AND COLLISIONS
-        # -----------------------------------------------------------
-
-
-        # Update lasers
-        for laser in lasers[:]:
-            laser.update()
-            if laser.is_off_screen():
-                lasers.remove(laser)
-
-        # Check laser-alien collisions
-        for laser in lasers[:]:
-            for alien in aliens_by_row[laser.row][:]:
-                if laser.collides_with(alien):
-                    lasers.remove(laser)
-                    alien.hit()
-                    if alien.health <= 0:
-                        aliens_by_row[laser.row].remove(alien)
-                    break
-
-        # Shoot lasers from blue items
-        if not game_over:
-            item_blue.shoot_lasers_if_needed(dt, lasers, GRID_ORIGIN_Y, CELL_HEIGHT)
-
-        # -----------------------------------------------------------
-
-
-        # -----------------------------------------------------------
-        # FLOATING BALL SPAWNING AND COLLECTION
-        # -----------------------------------------------------------
-        if not game_over and ball_spawn_timer >= ball_spawn_interval:     #######################
-            ball_spawn_timer = 0
-            print(f"[DEBUG] Natural mineral spawned at {pygame.time.get_ticks()} ms")
-            balls.append(FloatingBall())
-
-        if not game_over:
-            item_black.spawn_ball_if_needed(dt, balls)
-
-        for ball in balls[:]: #######################
-            ball.update()
-            if not game_over:
-                ball.draw(screen)
-
-            # Collect if close to mouse cursor
-            if ball.is_near_mouse(mouse_pos):
-                player_money += 5
-                balls.remove(ball)
-
-        if game_over:
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            overlay.set_alpha(128)
-            overlay.fill((0, 0, 0))
-            screen.blit(overlay, (0, 0))
-            game_over_text = font.render("Game Over", True, (255, 0, 0))
-            screen.blit(game_over_text, (SCREEN_WIDTH//2 - game_over_text.get_width()//2, SCREEN_HEIGHT//2 - game_over_text.get_height()//2))
-
-        pygame.display.update()
-        if game_over and current_time - game_over_time > 3000:
-            running = False
+def main(seed=None, record_path=None, profile=False, log_path=None, log_level=None, sim_hz=60, fps=60, resume_path=None, threaded=False,
+         render_scale=1.0, adaptive_quality=False, layout=None, rewind=False):
+    if log_level is not None:
+        event_log.set_level(log_level)
+    if log_path:
+        event_log.open(log_path)
+
+    try:
+        app = App(fps=fps)
+        app.push(GameScene(app, seed, record_path, profile, sim_hz, resume_path, threaded, render_scale, adaptive_quality, layout, rewind))
+        app.run()
+    finally:
+        event_log.close()
+
+
+def parse_seed(text):
+    try:
+        seed = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected an integer, got {text!r}")
+    if not 0 <= seed < SEED_LIMIT:
+        raise argparse.ArgumentTypeError(f"seeds must be in [0, {SEED_LIMIT}), got {seed}")
+    return seed
+
+
+def parse_size(text):
+    # "COLSxROWS" / "WIDTHxHEIGHT" -> (int, int)
+    try:
+        width, height = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {text!r}")
+    if width < 1 or height < 1:
+        raise argparse.ArgumentTypeError(f"sizes must be positive, got {text!r}")
+    return width, height
+
+
+def layout_from_args(args, parser):
+    # The GridLayout --grid/--cell-size ask for, None for the default
+    if args.grid is None and args.cell_size is None:
+        return None
+    if args.resume:
+        parser.error("--resume plays on the snapshot's own grid; drop --grid/--cell-size")
+    num_columns, num_rows = args.grid or (9, 5)
+    layout = GridLayout(num_columns, num_rows, cell_size=args.cell_size or DEFAULT_CELL_SIZE)
+    if max(layout.config()) > 0xFFFF:
+        parser.error("--grid/--cell-size values must be at most 65535 (snapshots store them as 16-bit)")
+    if args.record and max(layout.board_width, layout.board_height) > MAX_RECORDED_BOARD:
+        parser.error(f"--record needs a board at most {MAX_RECORDED_BOARD} px across, "
+                     f"this one is {layout.board_width}x{layout.board_height}")
+    return layout
+
+
+def check_game_arguments(args, parser):
+    # Rejects argument combinations add_game_arguments can't express
+    if args.resume and args.record:
+        parser.error("--record needs a game started from its seed, not --resume")
+    if not args.sim_hz > 0:  # also catches nan
+        parser.error("--sim-hz must be positive")
+    if not MIN_RENDER_SCALE <= args.render_scale <= 1:
+        parser.error("--render-scale must be in [%g, 1]" % MIN_RENDER_SCALE)
+
+
+def add_game_arguments(parser):
+    parser.add_argument("--seed", type=parse_seed, help="seed for the game's random stream")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record this session's input (replay it with python recording.py PATH); "
+                             "later games from the menu add -2, -3, ... before the extension")
+    parser.add_argument("--profile", action="store_true", help="record frame timings from the start (F12 dumps a trace)")
+    parser.add_argument("--log", metavar="PATH", help="write the event log to this file (JSON lines)")
+    parser.add_argument("--log-level", choices=["debug", "info", "warning", "error"], help="lowest event level to keep (default: info)")
+    parser.add_argument("--sim-hz", type=float, default=60, help="simulation ticks per second (default: 60)")
+    parser.add_argument("--fps", type=int, default=60, help="render frame cap, 0 for uncapped (default: 60)")
+    parser.add_argument("--resume", metavar="PATH", help="start from a saved snapshot (F5 in game, or recording.py --checkpoint-every)")
+    parser.add_argument("--threaded", action="store_true", help="run the simulation on its own thread, overlapping drawing")
+    parser.add_argument("--render-scale", type=float, default=1.0,
+                        help="internal resolution relative to the window, at least %g (default: 1)" % MIN_RENDER_SCALE)
+    parser.add_argument("--adaptive-quality", action="store_true", help="lower effects and resolution when frames run over budget")
+    parser.add_argument("--rewind", action="store_true", help="keep a snapshot every half second so Backspace can rewind")
+    parser.add_argument("--grid", type=parse_size, metavar="COLSxROWS", help="board size in cells; scroll with the arrow keys, zoom with the wheel")
+    parser.add_argument("--cell-size", type=parse_size, metavar="WxH",
+                        help="cell size in px with --grid (default: %dx%d)" % DEFAULT_CELL_SIZE)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scientists vs. Aliens")
+    add_game_arguments(parser)
+    args = parser.parse_args()
+    check_game_arguments(args, parser)
+    main(args.seed, args.record, args.profile, args.log, args.log_level, args.sim_hz, args.fps, args.resume, args.threaded,
+         args.render_scale, args.adaptive_quality, layout_from_args(args, parser), args.rewind)
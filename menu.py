@@ -1,65 +1,121 @@
-import pygame
-from sys import exit
-from subprocess import call
 import os
-import main
-
-def display_menu():
-    pygame.init()
-    pygame.display.set_caption("Scientists vs. Aliens")
-    clock = pygame.time.Clock()
-    screen = pygame.display.set_mode((1280, 720))
-    screen.fill("Black")
-
-    #base path for assets
-    base_path = os.path.join(os.path.dirname(__file__), "assets")
-
-    #load background image
-    bg_path = os.path.join(base_path, "Backgrounds", "background.png")
-    full_moon = pygame.image.load(bg_path)
-    full_moon = pygame.transform.scale(full_moon, (1280, 720))
-
-    #title text
-    font_path =os.path.join(base_path, "Font", "ka1.ttf")
-    title_text_font = pygame.font.Font(font_path, 60)
-    title_text_surface = title_text_font.render("Scientists vs. Aliens", False, "#5d2285")
-
-    #button setup
-    button_rect = pygame.Rect(550, 290, 180, 70)
-    button_color = "#5d2285"
-    button_hover_color = "#7e3bbd"
-
-    #play button text using Arial
-    play_font = pygame.font.SysFont("Arial", 30)
-    play_text_surface = play_font.render("PLAY", True, "White")
-    play_text_rect = play_text_surface.get_rect(center=button_rect.center)
-
-    running = True
-    while running:
-        screen.blit(full_moon, (0, 0))
-        screen.blit(title_text_surface, (175, 10))
+
+import pygame
+
+from event_log import event_log
+from main import GameScene, add_game_arguments, check_game_arguments, layout_from_args
+from scenes import App, Scene
+
+
+# -----------------------------------------------------------
+# CLASS: MenuScene
+# Title screen with a PLAY button. Built once and kept at the
+# bottom of the scene stack, so coming back from a game reuses
+# the same surfaces. game_options are passed to every
+# GameScene it starts (seed, record_path, profile, sim_hz,
+# resume_path, threaded, render_scale, adaptive_quality, layout,
+# rewind),
+# except that each game gets its own record_path (see
+# numbered_path).
+# -----------------------------------------------------------
+class MenuScene(Scene):
+    def __init__(self, app, **game_options):
+        super().__init__(app)
+        self.game_options = game_options
+        self.games_started = 0
+
+        #background image loads on the preload thread while the menu is already up
+        self.background_name, self.background_size = "Backgrounds/background.png", app.screen.get_size()
+        app.assets.preload([(self.background_name, self.background_size)])
+        self.full_moon = None
+
+        #title text
+        title_text_font = app.fonts.get("ka1.ttf", 60)
+        self.title_text_surface = title_text_font.render("Scientists vs. Aliens", False, "#5d2285")
+
+        #button setup
+        self.button_rect = pygame.Rect(550, 290, 180, 70)
+        self.button_color = "#5d2285"
+        self.button_hover_color = "#7e3bbd"
+
+        #play button text using the default font (no system font scan)
+        play_font = app.fonts.get(None, 30)
+        self.play_text_surface = play_font.render("PLAY", True, "White")
+        self.play_text_rect = self.play_text_surface.get_rect(center=self.button_rect.center)
+
+    def update(self, dt, events):
+        for event in events:
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                if self.button_rect.collidepoint(event.pos):
+                    event_log.info("menu", "play button pressed")
+                    self.games_started += 1
+                    options = dict(self.game_options)
+                    if options.get("record_path"):
+                        options["record_path"] = numbered_path(options["record_path"], self.games_started)
+                    self.app.push(GameScene(self.app, **options))
+                    return
+
+    def draw(self):
+        screen = self.app.screen
+        if self.full_moon is None:
+            self.full_moon = self.app.assets.image(self.background_name, self.background_size, wait=False)
+        if self.full_moon is not None:
+            screen.blit(self.full_moon, (0, 0))
+        else:
+            screen.fill("Black")
+        screen.blit(self.title_text_surface, (175, 10))
 
         mouse_pos = pygame.mouse.get_pos()
-        if button_rect.collidepoint(mouse_pos):
-            pygame.draw.rect(screen, button_hover_color, button_rect)
+        if self.button_rect.collidepoint(mouse_pos):
+            pygame.draw.rect(screen, self.button_hover_color, self.button_rect)
         else:
-            pygame.draw.rect(screen, button_color, button_rect)
+            pygame.draw.rect(screen, self.button_color, self.button_rect)
 
         #drawing "PLAY" on button
-        screen.blit(play_text_surface, play_text_rect)
+        screen.blit(self.play_text_surface, self.play_text_rect)
+        pygame.display.update()
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                exit()
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                if button_rect.collidepoint(event.pos):
-                    print("Button Pressed")
-                    main.main()
-                    screen.fill("Black")
 
-        pygame.display.update()
-        clock.tick(60)
+# -----------------------------------------------------------
+# FUNCTION: numbered_path
+# The path for the number-th file of a series: path itself for
+# the first, then e.g. game-2.svar, game-3.svar, ... so later
+# games don't overwrite earlier recordings.
+# -----------------------------------------------------------
+def numbered_path(path, number):
+    if number <= 1:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}-{number}{ext}"
+
+
+# -----------------------------------------------------------
+# FUNCTION: display_menu
+# Opens the window at the menu; PLAY starts a game and game
+# over comes back here without re-creating the window.
+# -----------------------------------------------------------
+def display_menu(seed=None, record_path=None, profile=False, log_path=None, log_level=None, sim_hz=60, fps=60, resume_path=None, threaded=False,
+                 render_scale=1.0, adaptive_quality=False, layout=None, rewind=False):
+    if log_level is not None:
+        event_log.set_level(log_level)
+    if log_path:
+        event_log.open(log_path)
+
+    try:
+        app = App(fps=fps)
+        app.push(MenuScene(app, seed=seed, record_path=record_path, profile=profile, sim_hz=sim_hz, resume_path=resume_path, threaded=threaded,
+                              render_scale=render_scale, adaptive_quality=adaptive_quality, layout=layout, rewind=rewind))
+        app.run()
+    finally:
+        event_log.close()
+
 
+if __name__ == "__main__":
+    import argparse
 
-display_menu()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scientists vs. Aliens")
+    add_game_arguments(parser)
+    args = parser.parse_args()
+    check_game_arguments(args, parser)
+    display_menu(args.seed, args.record, args.profile, args.log, args.log_level, args.sim_hz, args.fps, args.resume, args.threaded,
+                 args.render_scale, args.adaptive_quality, layout_from_args(args, parser), args.rewind)
@@ -0,0 +1,58 @@
+from entities import Alien, FloatingBall, Laser
+
+
+# -----------------------------------------------------------
+# CLASS: ObjectPool
+# Free list of recycled objects of one class. acquire() reuses a
+# released object (calling its reset() with the constructor's
+# arguments) or creates a new one; take() hands out objects as
+# they are, for callers that set every field. release() gives
+# one back.
+# At most max_free objects are kept around.
+# -----------------------------------------------------------
+class ObjectPool:
+    def __init__(self, cls, max_free=4096):
+        self.cls = cls
+        self.max_free = max_free
+        self.free = []
+        self.created = 0  # objects ever allocated by this pool
+
+    def acquire(self, *args):
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args)
+            return obj
+        self.created += 1
+        return self.cls(*args)
+
+    def take(self, count):
+        # count objects without calling reset(): recycled ones keep their
+        # old fields and new ones have none, so the caller sets them all
+        free, cls = self.free, self.cls
+        reused = min(count, len(free))
+        objs = free[len(free) - reused:]
+        del free[len(free) - reused:]
+        self.created += count - reused
+        objs.extend(cls.__new__(cls) for _ in range(count - reused))
+        return objs
+
+    def release(self, obj):
+        if len(self.free) < self.max_free:
+            self.free.append(obj)
+
+    def release_all(self, objs):
+        room = self.max_free - len(self.free)
+        if room > 0:
+            self.free.extend(objs[:room] if len(objs) > room else objs)
+
+
+# -----------------------------------------------------------
+# CLASS: EntityPools
+# One pool per pooled entity type, shared by a Simulation and
+# its TowerGrid.
+# -----------------------------------------------------------
+class EntityPools:
+    def __init__(self):
+        self.aliens = ObjectPool(Alien)
+        self.lasers = ObjectPool(Laser)
+        self.balls = ObjectPool(FloatingBall)
@@ -0,0 +1,230 @@
+import json
+import time
+from array import array
+
+import pygame
+
+from event_log import event_log
+from fonts import fonts
+
+
+# Entity counts stored per frame, in this order
+COUNT_KINDS = ("aliens", "lasers", "balls", "towers")
+
+# Colors for the overlay's phase bars, assigned in first-seen order
+PHASE_COLORS = [
+    (230, 80, 80), (240, 160, 60), (230, 220, 80), (120, 210, 90), (70, 200, 200),
+    (80, 140, 240), (160, 110, 240), (230, 110, 200), (200, 200, 200), (140, 140, 140),
+]
+
+
+# -----------------------------------------------------------
+# CLASS: FrameProfiler
+# Records how long each phase of every frame takes into a
+# fixed-size ring buffer (the last `capacity` frames).
+#
+# Hooks into Simulation.phase_mark and Renderer.phase_mark: each
+# lap(phase) charges the time since the previous lap to that
+# phase. While disabled both hooks are None and begin_frame() /
+# end_frame() return at once, so the game loop only pays a few
+# attribute checks per frame.
+#
+#   F3  toggle the overlay (turns recording on)
+#   F11 toggle recording without the overlay
+#   F12 write the buffer as a Chrome trace (chrome://tracing,
+#       ui.perfetto.dev)
+# -----------------------------------------------------------
+class FrameProfiler:
+    MAX_LAPS = 32  # laps kept per frame (several sim ticks can run per frame); later ones are dropped
+
+    def __init__(self, sim, renderer, capacity=600, trace_dir="."):
+        self.sim = sim
+        self.renderer = renderer
+        self.capacity = capacity
+        self.trace_dir = trace_dir
+        self.enabled = False
+        self.show_overlay = False
+
+        # Phase names are stored as small ids
+        self.phase_ids = {}
+        self.phase_names = []
+
+        # Ring buffer: one row per frame, MAX_LAPS laps per row
+        laps = capacity * self.MAX_LAPS
+        self.frame_start = array("d", bytes(8 * capacity))  # seconds since epoch
+        self.frame_ms = array("d", bytes(8 * capacity))
+        self.lap_count = array("B", bytes(capacity))
+        self.lap_phase = array("B", bytes(laps))
+        self.lap_start = array("d", bytes(8 * laps))
+        self.lap_ms = array("d", bytes(8 * laps))
+        self.counts = array("i", bytes(4 * capacity * len(COUNT_KINDS)))
+        self.frames = 0  # frames recorded so far; row = frames % capacity
+
+        self.epoch = time.perf_counter()
+        self.last = self.epoch
+        self.row = 0
+
+    # -----------------------------------------------------------
+    # ENABLE / DISABLE
+    # -----------------------------------------------------------
+    def set_enabled(self, enabled):
+        if enabled and not self.enabled:
+            # Toggled mid-frame (keys are read after begin_frame): record
+            # the rest of this frame in a fresh row
+            self._open_row()
+        self.enabled = enabled
+        lap = self.lap if enabled else None
+        self.sim.phase_mark = lap
+        self.renderer.phase_mark = lap
+        if not enabled:
+            self.show_overlay = False
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        if self.show_overlay and not self.enabled:
+            self.set_enabled(True)
+        self.renderer.compositor.invalidate()
+
+    def handle_key(self, key):
+        # Returns True if the key was a profiler key
+        if key == pygame.K_F3:
+            self.toggle_overlay()
+        elif key == pygame.K_F11:
+            self.set_enabled(not self.enabled)
+        elif key == pygame.K_F12:
+            event_log.info("profiler", "trace written", path=self.write_trace())
+        else:
+            return False
+        return True
+
+    # -----------------------------------------------------------
+    # RECORDING
+    # -----------------------------------------------------------
+    def begin_frame(self):
+        if self.enabled:
+            self._open_row()
+
+    def _open_row(self):
+        self.row = self.frames % self.capacity
+        self.lap_count[self.row] = 0
+        self.last = time.perf_counter()
+        self.frame_start[self.row] = self.last - self.epoch
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        phase_id = self.phase_ids.get(phase)
+        if phase_id is None:
+            phase_id = self.phase_ids[phase] = len(self.phase_names)
+            self.phase_names.append(phase)
+
+        row = self.row
+        n = self.lap_count[row]
+        if n < self.MAX_LAPS:
+            i = row * self.MAX_LAPS + n
+            self.lap_phase[i] = phase_id
+            self.lap_start[i] = self.last - self.epoch
+            self.lap_ms[i] = (now - self.last) * 1000
+            self.lap_count[row] = n + 1
+        self.last = now
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        row = self.row
+        self.frame_ms[row] = (self.last - self.epoch - self.frame_start[row]) * 1000
+        base = row * len(COUNT_KINDS)
+        for i, count in enumerate(self.sim.entity_counts().values()):
+            self.counts[base + i] = count
+        self.frames += 1
+
+    def recent_rows(self, limit=None):
+        # Buffer rows of the last `limit` recorded frames, oldest first
+        available = min(self.frames, self.capacity)
+        if limit is not None:
+            available = min(available, limit)
+        return [(self.frames - available + i) % self.capacity for i in range(available)]
+
+    def phase_averages(self, limit=60):
+        # Mean ms per frame of each phase over the last `limit` frames
+        rows = self.recent_rows(limit)
+        totals = [0.0] * len(self.phase_names)
+        for row in rows:
+            base = row * self.MAX_LAPS
+            for i in range(base, base + self.lap_count[row]):
+                totals[self.lap_phase[i]] += self.lap_ms[i]
+        n = max(len(rows), 1)
+        return [(name, total / n) for name, total in zip(self.phase_names, totals)]
+
+    # -----------------------------------------------------------
+    # TRACE EXPORT (Chrome trace-event format)
+    # -----------------------------------------------------------
+    def trace_events(self):
+        events = [{"name": "thread_name", "ph": "M", "pid": 1, "tid": 1, "args": {"name": "game loop"}}]
+        for row in self.recent_rows():
+            frame_us = self.frame_start[row] * 1e6
+            events.append({"name": "frame", "cat": "frame", "ph": "X", "pid": 1, "tid": 1,
+                           "ts": frame_us, "dur": self.frame_ms[row] * 1000})
+            base = row * self.MAX_LAPS
+            for i in range(base, base + self.lap_count[row]):
+                events.append({"name": self.phase_names[self.lap_phase[i]], "cat": "phase", "ph": "X",
+                               "pid": 1, "tid": 1, "ts": self.lap_start[i] * 1e6, "dur": self.lap_ms[i] * 1000})
+            base = row * len(COUNT_KINDS)
+            events.append({"name": "entities", "ph": "C", "pid": 1, "ts": frame_us,
+                           "args": {kind: self.counts[base + i] for i, kind in enumerate(COUNT_KINDS)}})
+        return events
+
+    def write_trace(self, path=None):
+        if path is None:
+            path = f"{self.trace_dir}/trace-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f)
+        return path
+
+    # -----------------------------------------------------------
+    # OVERLAY: frame-time graph, phase bars and entity counts
+    # Drawn on top of the frame, before Renderer.present().
+    # -----------------------------------------------------------
+    def draw_overlay(self, screen):
+        if not self.show_overlay:
+            return
+        font = fonts.get(None, 20)
+
+        graph_frames, graph_height, scale = 300, 60, 3  # 3 px per ms
+        width = graph_frames + 20
+        bar_rows = len(self.phase_names)
+        height = graph_height + 50 + bar_rows * 14
+        panel_rect = pygame.Rect(10, screen.get_height() - height - 10, width, height)
+        panel = pygame.Surface(panel_rect.size)
+        panel.set_alpha(200)
+        panel.fill((0, 0, 0))
+        screen.blit(panel, panel_rect)
+        rects = [panel_rect]
+        x0, y = panel_rect.x + 10, panel_rect.y + 8
+
+        # Frame time graph, with a line at the 60 FPS budget
+        rows = self.recent_rows(graph_frames)
+        bottom = y + graph_height
+        for i, row in enumerate(rows):
+            ms = self.frame_ms[row]
+            color = (120, 210, 90) if ms <= 1000 / 60 else (230, 80, 80)
+            pygame.draw.line(screen, color, (x0 + i, bottom), (x0 + i, bottom - min(ms * scale, graph_height)))
+        budget_y = bottom - (1000 / 60) * scale
+        pygame.draw.line(screen, (255, 255, 255), (x0, budget_y), (x0 + graph_frames, budget_y))
+        y = bottom + 4
+
+        last = rows[-1] if rows else 0
+        base = last * len(COUNT_KINDS)
+        counts = "  ".join(f"{kind} {self.counts[base + i]}" for i, kind in enumerate(COUNT_KINDS))
+        rects.append(screen.blit(font.render(f"{self.frame_ms[last]:.1f} ms  {counts}", True, (255, 255, 255)), (x0, y)))
+        y += 18
+
+        # Average ms per phase over the last second
+        for i, (name, ms) in enumerate(self.phase_averages()):
+            color = PHASE_COLORS[i % len(PHASE_COLORS)]
+            pygame.draw.rect(screen, color, (x0 + 110, y + 3, min(ms * 20, width - 130), 8))
+            rects.append(screen.blit(font.render(f"{name} {ms:.2f}", True, color), (x0, y)))
+            y += 14
+
+        self.renderer.compositor.mark(rects)
+        if self.enabled:
+            self.lap("profiler")
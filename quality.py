@@ -0,0 +1,97 @@
+from collections import deque
+
+from event_log import event_log
+
+
+# -----------------------------------------------------------
+# CLASS: QualityLevel
+# One rendering quality setting:
+# - scale: internal resolution relative to the window (the
+#   frame is drawn that size, then stretched to the window)
+# - alien_flashes: hit aliens turn see-through (alpha blits)
+# - health_bars: damaged towers show a health bar
+# - rounded_corners: rounded grid cells and panels in the
+#   static background (only costs when it's rebuilt)
+# -----------------------------------------------------------
+class QualityLevel:
+    __slots__ = ("name", "scale", "alien_flashes", "health_bars", "rounded_corners")
+
+    def __init__(self, name, scale, alien_flashes=True, health_bars=True, rounded_corners=True):
+        self.name = name
+        self.scale = scale
+        self.alien_flashes = alien_flashes
+        self.health_bars = health_bars
+        self.rounded_corners = rounded_corners
+
+    def scaled(self, factor):
+        return QualityLevel(self.name, self.scale * factor, self.alien_flashes, self.health_bars, self.rounded_corners)
+
+
+# Best first; the governor steps down this list under load.
+# Effects go before resolution, since they're cheaper to lose.
+QUALITY_LEVELS = (
+    QualityLevel("high", 1.0),
+    QualityLevel("medium", 1.0, alien_flashes=False, rounded_corners=False),
+    QualityLevel("low", 0.75, alien_flashes=False, rounded_corners=False),
+    QualityLevel("lowest", 0.5, alien_flashes=False, health_bars=False, rounded_corners=False),
+)
+
+
+# Smallest --render-scale; the lowest level goes half as far again
+MIN_RENDER_SCALE = 0.25
+
+
+def quality_levels(render_scale=1.0):
+    # QUALITY_LEVELS with every scale relative to render_scale
+    return [level.scaled(render_scale) for level in QUALITY_LEVELS]
+
+
+# -----------------------------------------------------------
+# CLASS: QualityGovernor
+# Watches how long recent frames took to produce (work time,
+# not including the frame cap's sleep) and picks a quality
+# level to stay within budget_ms:
+# - the average of the last `window` frames over budget steps
+#   one level down straight away
+# - an average under headroom * budget steps one level back up,
+#   but only after `cooldown` frames at the current level, so
+#   it doesn't flip back and forth at the edge of the budget
+# record(frame_ms) returns the new QualityLevel when it
+# changes, else None.
+# -----------------------------------------------------------
+class QualityGovernor:
+    def __init__(self, levels=QUALITY_LEVELS, budget_ms=1000 / 60, window=30, headroom=0.6, cooldown=120):
+        self.levels = list(levels)
+        self.budget_ms = budget_ms
+        self.headroom = headroom
+        self.cooldown = cooldown
+        self.samples = deque(maxlen=window)
+        self.index = 0
+        self.frames_at_level = 0
+
+    @property
+    def level(self):
+        return self.levels[self.index]
+
+    def record(self, frame_ms):
+        samples = self.samples
+        samples.append(frame_ms)
+        self.frames_at_level += 1
+        if len(samples) < samples.maxlen:
+            return None
+
+        average = sum(samples) / len(samples)
+        if average > self.budget_ms and self.index < len(self.levels) - 1:
+            return self._change(self.index + 1, average)
+        if (average < self.budget_ms * self.headroom and self.index > 0
+                and self.frames_at_level >= self.cooldown):
+            return self._change(self.index - 1, average)
+        return None
+
+    def _change(self, index, average):
+        self.index = index
+        self.samples.clear()
+        self.frames_at_level = 0
+        level = self.level
+        event_log.info("quality", "changed", quality=level.name, scale=level.scale, frame_ms=round(average, 3))
+        return level
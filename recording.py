@@ -0,0 +1,163 @@
+import gzip
+import os
+import struct
+import time
+
+from layout import GridLayout, layout_from_config
+from simulation import Simulation, TickInput
+
+
+# -----------------------------------------------------------
+# FILE FORMAT
+# gzip-compressed stream:
+#   header:   magic b"SVAR", format version (H), seed (Q), then
+#             the grid as GridLayout.config() gives it (4 x H)
+#   per tick: dt (d), mouse x (h), mouse y (h), pickup x (h),
+#             pickup y (h), button count (B), then one byte per
+#             button transition
+# Consecutive ticks are nearly identical, so they compress well.
+# -----------------------------------------------------------
+RECORDING_MAGIC = b"SVAR"
+RECORDING_VERSION = 3
+_HEADER = struct.Struct("<4sHQHHHH")
+_TICK = struct.Struct("<dhhhhB")
+
+# Cursor positions are stored as 16-bit, so boards are at most
+# this many px across to be recorded
+MAX_RECORDED_BOARD = 32767
+
+
+def _clamp16(value):
+    return max(-32768, min(32767, int(value)))
+
+
+# -----------------------------------------------------------
+# CLASS: InputRecorder
+# Writes the seed, the grid and every tick's input (dt, mouse
+# and ball pickup positions in board coordinates, button
+# transitions) to a recording file.
+# -----------------------------------------------------------
+class InputRecorder:
+    def __init__(self, path, seed, layout=None):
+        layout = layout or GridLayout()
+        if max(layout.board_width, layout.board_height) > MAX_RECORDED_BOARD:
+            raise ValueError("board is too large to record: cursor positions are stored as 16-bit")
+        self.path = path
+        self.file = gzip.open(path, "wb")
+        self.file.write(_HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION, seed, *layout.config()))
+        self.ticks = 0
+
+    def record(self, dt, inputs):
+        mouse_x, mouse_y = inputs.mouse_pos
+        pickup_x, pickup_y = inputs.pickup_pos
+        buttons = inputs.buttons
+        self.file.write(_TICK.pack(dt, _clamp16(mouse_x), _clamp16(mouse_y),
+                                   _clamp16(pickup_x), _clamp16(pickup_y), len(buttons)))
+        if buttons:
+            self.file.write(bytes(buttons))
+        self.ticks += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# -----------------------------------------------------------
+# FUNCTION: load_recording
+# Reads a recording file. Returns (seed, ticks, layout) where
+# ticks is a list of (dt, TickInput) and layout is the grid the
+# game was played on.
+# -----------------------------------------------------------
+def load_recording(path):
+    with gzip.open(path, "rb") as f:
+        data = f.read()
+
+    magic, version, seed, *grid = _HEADER.unpack_from(data, 0)
+    if magic != RECORDING_MAGIC:
+        raise ValueError(f"{path} is not a game recording")
+    if version != RECORDING_VERSION:
+        raise ValueError(f"{path}: unsupported recording version {version}")
+
+    ticks = []
+    offset = _HEADER.size
+    while offset < len(data):
+        dt, mouse_x, mouse_y, pickup_x, pickup_y, num_buttons = _TICK.unpack_from(data, offset)
+        offset += _TICK.size
+        buttons = data[offset:offset + num_buttons]
+        offset += num_buttons
+        ticks.append((dt, TickInput((mouse_x, mouse_y), buttons, (pickup_x, pickup_y))))
+    return seed, ticks, layout_from_config(*grid)
+
+
+# -----------------------------------------------------------
+# FUNCTION: replay
+# Re-runs a recording headless, as fast as the CPU allows.
+# Accepts a path or an already loaded (seed, ticks, layout).
+# With sim (e.g. restored from a snapshot of this session), it
+# carries on from sim.ticks instead of starting from the seed;
+# until stops once the sim reaches that tick.
+# Returns the simulation in its final state.
+# -----------------------------------------------------------
+def replay(recording, sim_class=Simulation, on_tick=None, sim=None, until=None):
+    seed, ticks, layout = load_recording(recording) if isinstance(recording, str) else recording
+    if sim is None:
+        sim = sim_class(layout, seed=seed)
+    elif sim.seed != seed:
+        raise ValueError(f"snapshot seed {sim.seed} does not match recording seed {seed}")
+    elif sim.layout.config() != layout.config():
+        raise ValueError(f"snapshot grid {sim.layout.config()} does not match recording grid {layout.config()}")
+    for dt, inputs in ticks[sim.ticks:until]:
+        sim.step(dt, inputs)
+        if on_tick is not None:
+            on_tick(sim)
+    return sim
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay a recorded game session headless.")
+    parser.add_argument("recording")
+    parser.add_argument("--arrays", action="store_true", help="use the NumPy-backed ArraySimulation")
+    parser.add_argument("--resume", metavar="SNAPSHOT", help="start from a snapshot of this session instead of tick 0")
+    parser.add_argument("--until", type=int, metavar="TICK", help="stop at this tick")
+    parser.add_argument("--checkpoint-every", type=int, metavar="TICKS", help="save a snapshot every TICKS ticks")
+    parser.add_argument("--checkpoint-dir", default="checkpoints", help="where checkpoints go (default: checkpoints)")
+    parser.add_argument("--save", metavar="PATH", help="save a snapshot of the final state (play on with main.py --resume)")
+    args = parser.parse_args()
+
+    import snapshot
+
+    sim_class = Simulation
+    if args.arrays:
+        from entity_store import ArraySimulation
+        sim_class = ArraySimulation
+
+    seed, ticks, layout = load_recording(args.recording)
+    sim = snapshot.load(args.resume) if args.resume else None
+    first_tick = sim.ticks if sim is not None else 0
+
+    on_tick = None
+    if args.checkpoint_every:
+        os.makedirs(args.checkpoint_dir, exist_ok=True)
+
+        def save_checkpoint(sim):
+            if sim.ticks % args.checkpoint_every == 0:
+                snapshot.save(sim, os.path.join(args.checkpoint_dir, f"tick{sim.ticks:08d}.svas"))
+
+        on_tick = save_checkpoint
+
+    start = time.perf_counter()
+    sim = replay((seed, ticks, layout), sim_class, on_tick, sim, args.until)
+    elapsed = time.perf_counter() - start
+    if args.save:
+        snapshot.save(sim, args.save)
+    replayed = sim.ticks - first_tick
+    print(f"replayed {replayed} ticks (seed {seed}, ticks {first_tick}-{sim.ticks}) in {elapsed:.2f}s "
+          f"({replayed / max(elapsed, 1e-9):.0f} ticks/s), sim time {sim.time / 1000:.1f}s, "
+          f"money: {sim.player_money}, game over: {sim.game_over}")
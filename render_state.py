@@ -0,0 +1,150 @@
+import copy
+from bisect import bisect_left, bisect_right
+from operator import attrgetter
+
+_lane_order = attrgetter("row", "x")
+_x = attrgetter("x")
+
+
+# -----------------------------------------------------------
+# CLASS: RenderState
+# Everything the Renderer needs to draw one tick, copied out of
+# a Simulation into plain lists and tuples: the money, the two
+# drag items, towers (x, y, type, health) and, per entity kind,
+# one list per column. Moving entities keep their previous
+# position too, so a frame can be interpolated within the tick.
+# Built by capture_render_state() and never modified after, so
+# another thread can draw it while the simulation moves on.
+# -----------------------------------------------------------
+class RenderState:
+    __slots__ = (
+        "layout", "tick", "time", "money", "game_over", "finished", "counts",
+        "item_blue", "item_black", "towers", "tower_width", "tower_height",
+        "laser_prev_x", "laser_x", "laser_y", "laser_width", "laser_height",
+        "alien_prev_x", "alien_x", "alien_y", "alien_alpha", "alien_size",
+        "ball_prev_x", "ball_prev_y", "ball_x", "ball_y", "ball_radius",
+    )
+
+    def entity_counts(self):
+        return self.counts
+
+
+# -----------------------------------------------------------
+# FUNCTION: capture_render_state
+# Copies what the Renderer draws out of a Simulation or an
+# ArraySimulation into a new RenderState. With view (a board
+# box (left, top, right, bottom), see Camera.view_rect) only
+# what overlaps it is copied, so a frame's cost follows the
+# size of the window rather than of the board.
+# -----------------------------------------------------------
+def capture_render_state(sim, view=None):
+    if view is not None:
+        return _capture_view(sim, view)
+    state = _capture_common(sim)
+    state.towers = sim.towers.draw_list()
+
+    if hasattr(sim, "alien_store"):
+        lasers, aliens, balls = sim.laser_store, sim.alien_store, sim.ball_store
+        state.laser_prev_x, state.laser_x, state.laser_y = lasers["prev_x"].tolist(), lasers["x"].tolist(), lasers["y"].tolist()
+        state.laser_width, state.laser_height = sim.laser_width, sim.laser_height
+        state.alien_prev_x, state.alien_x, state.alien_y = aliens["prev_x"].tolist(), aliens["x"].tolist(), aliens["y"].tolist()
+        state.alien_alpha = aliens["alpha"].tolist()
+        state.alien_size = sim.alien_size
+        state.ball_prev_x, state.ball_prev_y = balls["prev_x"].tolist(), balls["prev_y"].tolist()
+        state.ball_x, state.ball_y = balls["x"].tolist(), balls["y"].tolist()
+        state.ball_radius = sim.ball_radius
+        return state
+
+    lasers = sim.lasers
+    state.laser_prev_x = [laser.prev_x for laser in lasers]
+    state.laser_x = [laser.x for laser in lasers]
+    state.laser_y = [laser.y for laser in lasers]
+    state.laser_width, state.laser_height = 10, 5
+    aliens = [a for row_aliens in sim.aliens_by_row for a in row_aliens]
+    state.alien_prev_x = [a.prev_x for a in aliens]
+    state.alien_x = [a.x for a in aliens]
+    state.alien_y = [a.y for a in aliens]
+    state.alien_alpha = [a.alpha for a in aliens]
+    state.alien_size = sim.layout.cell_width // 2
+    balls = sim.balls
+    state.ball_prev_x = [ball.prev_x for ball in balls]
+    state.ball_prev_y = [ball.prev_y for ball in balls]
+    state.ball_x = [ball.x for ball in balls]
+    state.ball_y = [ball.y for ball in balls]
+    state.ball_radius = 10
+    return state
+
+
+def _capture_common(sim):
+    state = RenderState()
+    state.layout = sim.layout
+    state.tick, state.time = sim.ticks, sim.time
+    state.money = sim.player_money
+    state.game_over, state.finished = sim.game_over, sim.finished
+    state.counts = sim.entity_counts()
+    state.item_blue, state.item_black = copy.copy(sim.item_blue), copy.copy(sim.item_black)
+    towers = sim.towers
+    state.tower_width, state.tower_height = towers.tower_width, towers.tower_height
+    return state
+
+
+def _capture_view(sim, view):
+    state = _capture_common(sim)
+    layout, towers = sim.layout, sim.towers
+    left, top, right, bottom = view
+
+    # Towers: only the cells in view are looked at
+    rows, cols = layout.cells_in(left, top, right, bottom)
+    types, health, position = towers.types, towers.health, towers.position
+    cells = [row * layout.num_columns + col for row in rows for col in cols]
+    state.towers = [(*position(cell), types[cell], health[cell]) for cell in cells if types[cell]]
+
+    if hasattr(sim, "alien_store"):
+        lasers, aliens, balls = sim.laser_store, sim.alien_store, sim.ball_store
+        state.laser_width, state.laser_height = sim.laser_width, sim.laser_height
+        state.alien_size = size = sim.alien_size
+        state.ball_radius = radius = sim.ball_radius
+
+        xs, ys = lasers["x"], lasers["y"]
+        keep = (xs > left - state.laser_width) & (xs < right) & (ys > top - state.laser_height) & (ys < bottom)
+        state.laser_prev_x, state.laser_x, state.laser_y = lasers["prev_x"][keep].tolist(), xs[keep].tolist(), ys[keep].tolist()
+        xs, ys = aliens["x"], aliens["y"]
+        keep = (xs > left - size) & (xs < right) & (ys > top - size) & (ys < bottom)
+        state.alien_prev_x, state.alien_x, state.alien_y = aliens["prev_x"][keep].tolist(), xs[keep].tolist(), ys[keep].tolist()
+        state.alien_alpha = aliens["alpha"][keep].tolist()
+        xs, ys = balls["x"], balls["y"]
+        keep = (xs > left - radius) & (xs < right + radius) & (ys > top - radius) & (ys < bottom + radius)
+        state.ball_prev_x, state.ball_prev_y = balls["prev_x"][keep].tolist(), balls["prev_y"][keep].tolist()
+        state.ball_x, state.ball_y = xs[keep].tolist(), ys[keep].tolist()
+        return state
+
+    # The simulation keeps lasers sorted by (row, x) and each lane's
+    # aliens by x, so each visible lane's window is found by bisection
+    state.laser_width, state.laser_height = 10, 5
+    all_lasers, lasers = sim.lasers, []
+    for row in rows:
+        lo = bisect_right(all_lasers, (row, left - 10), key=_lane_order)
+        hi = bisect_left(all_lasers, (row, right), lo, key=_lane_order)
+        lasers.extend(all_lasers[lo:hi])
+    state.laser_prev_x = [laser.prev_x for laser in lasers]
+    state.laser_x = [laser.x for laser in lasers]
+    state.laser_y = [laser.y for laser in lasers]
+    state.alien_size = size = layout.cell_width // 2
+    aliens = []
+    for row in rows:
+        row_aliens = sim.aliens_by_row[row]
+        lo = bisect_right(row_aliens, left - size, key=_x)
+        aliens.extend(row_aliens[lo:bisect_left(row_aliens, right, lo, key=_x)])
+    state.alien_prev_x = [a.prev_x for a in aliens]
+    state.alien_x = [a.x for a in aliens]
+    state.alien_y = [a.y for a in aliens]
+    state.alien_alpha = [a.alpha for a in aliens]
+
+    # Balls come from the spatial hash, which only visits the cells in view
+    state.ball_radius = radius = 10
+    balls = sim.ball_hash.query_rect(left - radius, top - radius, right - left + 2 * radius, bottom - top + 2 * radius)
+    state.ball_prev_x = [ball.prev_x for ball in balls]
+    state.ball_prev_y = [ball.prev_y for ball in balls]
+    state.ball_x = [ball.x for ball in balls]
+    state.ball_y = [ball.y for ball in balls]
+    return state
@@ -0,0 +1,173 @@
+import pygame
+
+from camera import Camera
+from compositor import Compositor
+from fonts import fonts, text_cache, TextLabel
+from quality import QUALITY_LEVELS
+from render_state import capture_render_state
+from sprite_cache import sprite_cache
+from tower_grid import draw_towers, TOWER_CODES, TOWER_COLORS
+
+
+# -----------------------------------------------------------
+# CLASS: Renderer
+# Draws the current state of a Simulation onto a surface.
+# The simulation never calls into this; it is one optional
+# consumer of the game state.
+#
+# The static background comes from the Compositor's cache;
+# only entities, HUD text and overlays are drawn each frame.
+#
+# Everything is drawn from a RenderState (see render_state.py):
+# draw() copies one out of the simulation, draw_state() takes
+# one captured elsewhere, e.g. on the simulation thread.
+#
+# The board (towers, aliens, lasers, balls) is drawn through
+# the Camera and kept below the HUD band; the HUD (money, item
+# buttons, prices) is not scrolled. Balls still float over the
+# HUD while the camera is at home (board and window line up),
+# since that is where the cursor can pick them up. Only what
+# is in view is captured and drawn.
+#
+# The QualityLevel (see quality.py) sets the internal
+# resolution, as a scale on every position and size, and which
+# optional effects are drawn. set_quality() switches it.
+# -----------------------------------------------------------
+class Renderer:
+    def __init__(self, screen, sim, quality=None, camera=None):
+        self.screen = screen
+        self.sim = sim
+        self.camera = camera or Camera(sim.layout, *screen.get_size())
+        self.compositor = Compositor(screen, sim.layout, self.camera)
+        self.phase_mark = None  # optional callable(phase_name), see draw_state()
+        self.set_quality(quality or QUALITY_LEVELS[0])
+
+    def set_quality(self, quality):
+        self.quality = quality
+        scale = quality.scale
+        self.compositor.set_scale(scale, quality.rounded_corners)
+
+        # Fonts, sized for the internal resolution
+        self.font = fonts.get(None, max(1, round(48 * scale)))
+        self.small_font = fonts.get(None, max(1, round(24 * scale)))
+
+        # HUD text that only re-renders when its value changes
+        self.money_label = TextLabel(self.font, (255, 255, 255))
+        self.cost_label_blue = TextLabel(self.small_font, (255, 255, 255))
+        self.cost_label_black = TextLabel(self.small_font, (255, 255, 255))
+
+    def draw(self, alpha=1.0):
+        # alpha: fraction of a tick elapsed since the last sim step;
+        # moving entities are drawn that far between their previous
+        # and current positions
+        self.draw_state(capture_render_state(self.sim, self.camera.view_rect()), alpha)
+
+    def draw_state(self, state, alpha=1.0):
+        compositor = self.compositor
+        canvas = compositor.canvas
+        mark = compositor.mark
+        phase = self.phase_mark  # optional callable(phase_name), like Simulation.phase_mark
+        quality = self.quality
+        k, ox, oy = self.camera.transform(quality.scale)
+
+        compositor.begin_frame()
+        if phase is not None:
+            phase("background")
+
+        self._draw_ui(state.money, state.item_blue, state.item_black, state.towers, state.tower_width, state.tower_height)
+        if phase is not None:
+            phase("ui")
+
+        # -----------------------------------------------------------
+        # LASERS, ALIENS AND FLOATING BALLS
+        # Blits each entity kind at once with Surface.blits.
+        # -----------------------------------------------------------
+        canvas.set_clip(compositor.board_rect())
+        sprite = sprite_cache.rect(state.laser_width * k, state.laser_height * k, (255, 0, 0))
+        mark(canvas.blits([
+            (sprite, ((px + (x - px) * alpha) * k + ox, y * k + oy))
+            for px, x, y in zip(state.laser_prev_x, state.laser_x, state.laser_y)
+        ]))
+        if not state.game_over:
+            size = state.alien_size * k
+            if quality.alien_flashes:
+                sprites = {opacity: sprite_cache.rect(size, size, (0, 255, 0), opacity) for opacity in set(state.alien_alpha)}
+            else:
+                # Hit aliens stay opaque, which skips the alpha blend
+                sprites = dict.fromkeys(set(state.alien_alpha), sprite_cache.rect(size, size, (0, 255, 0)))
+            mark(canvas.blits([
+                (sprites[opacity], ((px + (x - px) * alpha) * k + ox, y * k + oy))
+                for px, x, y, opacity in zip(state.alien_prev_x, state.alien_x, state.alien_y, state.alien_alpha)
+            ]))
+            if self.camera.at_home():
+                canvas.set_clip(None)
+            radius = max(1, round(state.ball_radius * k))
+            sprite = sprite_cache.circle(radius, (0, 255, 255))
+            mark(canvas.blits([
+                (sprite, (int((px + (x - px) * alpha) * k + ox) - radius, int((py + (y - py) * alpha) * k + oy) - radius))
+                for px, py, x, y in zip(state.ball_prev_x, state.ball_prev_y, state.ball_x, state.ball_y)
+            ]))
+        canvas.set_clip(None)
+        if phase is not None:
+            phase("entities")
+
+        if state.game_over:
+            self._draw_game_over()
+        compositor.end_frame()
+        if phase is not None:
+            phase("overlay")
+
+    # -----------------------------------------------------------
+    # TOP UI BAR (money display, item buttons, prices) AND TOWERS
+    # -----------------------------------------------------------
+    def _draw_ui(self, money, item_blue, item_black, towers, tower_width, tower_height):
+        canvas = self.compositor.canvas
+        layout = self.sim.layout
+        mark = self.compositor.mark
+        quality = self.quality
+        s = quality.scale
+        k, ox, oy = self.camera.transform(s)
+
+        money_text = self.money_label.render(money)
+        text_rect = money_text.get_rect(center=((layout.money_box_x + layout.money_box_width // 2) * s, (12.5 + 145 // 2) * s))
+        mark(canvas.blit(money_text, text_rect))
+
+        # Drop previews and towers are on the board
+        items = (item_blue, item_black)
+        canvas.set_clip(self.compositor.board_rect())
+        for item in items:
+            position = item.preview_position(*layout.grid_args())
+            if position is not None:
+                preview = sprite_cache.rect(item.width * k, item.height * k, TOWER_COLORS[TOWER_CODES[item.type]], 100)
+                mark(canvas.blit(preview, (position[0] * k + ox, position[1] * k + oy)))
+        mark(draw_towers(canvas, towers, tower_width, tower_height, k, quality.health_bars, (ox, oy)))
+        canvas.set_clip(None)
+
+        # Items sit in the HUD until they're dragged onto the board,
+        # where they're in board coordinates; prices go underneath
+        for item, label in ((item_blue, self.cost_label_blue), (item_black, self.cost_label_black)):
+            if item.dragging and item.y + item.height // 2 >= self.camera.hud_height:
+                ik, iox, ioy = k, ox, oy
+            else:
+                ik, iox, ioy = s, 0, 0
+            sprite = sprite_cache.rect(item.width * ik, item.height * ik, TOWER_COLORS[TOWER_CODES[item.type]])
+            mark(canvas.blit(sprite, (item.x * ik + iox, item.y * ik + ioy)))
+            cost_text = label.render(item.cost)
+            cost_rect = cost_text.get_rect(center=((item.x + item.width // 2) * ik + iox, (item.y + item.height + 12) * ik + ioy))
+            mark(canvas.blit(cost_text, cost_rect))
+
+    def _draw_game_over(self):
+        canvas = self.compositor.canvas
+        width, height = canvas.get_size()
+        overlay = pygame.Surface((width, height))
+        overlay.set_alpha(128)
+        overlay.fill((0, 0, 0))
+        canvas.blit(overlay, (0, 0))
+        game_over_text = text_cache.render(self.font, "Game Over", (255, 0, 0))
+        canvas.blit(game_over_text, (width // 2 - game_over_text.get_width() // 2, height // 2 - game_over_text.get_height() // 2))
+        self.compositor.mark_full()
+
+    def present(self):
+        self.compositor.present()
+        if self.phase_mark is not None:
+            self.phase_mark("present")
@@ -0,0 +1,160 @@
+import time
+
+import pygame
+
+from assets import assets
+from event_log import event_log
+from fonts import fonts, text_cache
+from layout import SCREEN_WIDTH, SCREEN_HEIGHT
+
+
+# -----------------------------------------------------------
+# CLASS: Scene
+# One screen of the game (menu, game, game over). The App calls
+# enter() when the scene becomes the top of the stack, exit()
+# when it leaves it, then update(dt, events) and draw() once
+# per frame while it is on top.
+# -----------------------------------------------------------
+class Scene:
+    def __init__(self, app):
+        self.app = app
+
+    def enter(self):
+        pass
+
+    def exit(self):
+        pass
+
+    def update(self, dt, events):
+        pass
+
+    def draw(self):
+        pass
+
+
+# -----------------------------------------------------------
+# CLASS: App
+# Owns everything scenes share: the one display surface, the
+# clock, fonts and assets. SDL is initialized and the window is
+# created once; scenes are pushed, popped and replaced on a
+# stack and only the top one runs. The loop ends when the stack
+# is empty or the window is closed.
+#
+# Cold start (App created -> first frame shown) and every scene
+# switch are timed and logged as "scene" events.
+# -----------------------------------------------------------
+class App:
+    def __init__(self, size=(SCREEN_WIDTH, SCREEN_HEIGHT), fps=60):
+        self.start_time = time.perf_counter()
+        pygame.init()
+        pygame.display.set_caption("Scientists vs. Aliens")
+        self.screen = pygame.display.set_mode(size)
+        self.clock = pygame.time.Clock()
+        self.fps = fps
+        self.fonts = fonts
+        self.text_cache = text_cache
+        self.assets = assets
+        self.scenes = []
+        self.running = False
+        self.cold_start_ms = None
+        self.last_switch_ms = None
+
+    @property
+    def scene(self):
+        return self.scenes[-1] if self.scenes else None
+
+    # -----------------------------------------------------------
+    # SCENE STACK
+    # -----------------------------------------------------------
+    def push(self, scene):
+        start = time.perf_counter()
+        if self.scenes:
+            self.scenes[-1].exit()
+        self.scenes.append(scene)
+        scene.enter()
+        self._switched(start)
+
+    def pop(self):
+        start = time.perf_counter()
+        scene = self.scenes.pop()
+        scene.exit()
+        if self.scenes:
+            self.scenes[-1].enter()
+        self._switched(start)
+        return scene
+
+    def replace(self, scene):
+        start = time.perf_counter()
+        if self.scenes:
+            self.scenes.pop().exit()
+        self.scenes.append(scene)
+        scene.enter()
+        self._switched(start)
+
+    def quit(self):
+        self.running = False
+
+    def _switched(self, start):
+        self.last_switch_ms = (time.perf_counter() - start) * 1000
+        scene = self.scene
+        event_log.info("scene", "switched", to=type(scene).__name__ if scene else None, ms=round(self.last_switch_ms, 3))
+
+    # -----------------------------------------------------------
+    # MAIN LOOP
+    # -----------------------------------------------------------
+    def run(self):
+        self.running = True
+        try:
+            while self.running and self.scenes:
+                dt = self.clock.tick(self.fps)
+                events = pygame.event.get()
+                if any(event.type == pygame.QUIT for event in events):
+                    break
+
+                scene = self.scenes[-1]
+                scene.update(dt, events)
+                # update() may have switched scenes; the new one draws next frame
+                if self.scenes and self.scenes[-1] is scene:
+                    scene.draw()
+
+                if self.cold_start_ms is None:
+                    self.cold_start_ms = (time.perf_counter() - self.start_time) * 1000
+                    event_log.info("scene", "first frame", scene=type(scene).__name__, ms=round(self.cold_start_ms, 3))
+        finally:
+            while self.scenes:
+                self.scenes.pop().exit()
+            self.running = False
+
+
+# -----------------------------------------------------------
+# CLASS: GameOverScene
+# Dims the last game frame and shows the result. Any click or
+# key press returns to the scene below it on the stack (the
+# menu); with nothing below it, the app ends.
+# -----------------------------------------------------------
+class GameOverScene(Scene):
+    def __init__(self, app, sim):
+        super().__init__(app)
+        self.sim = sim
+
+    def enter(self):
+        screen = self.app.screen
+        width, height = screen.get_size()
+        overlay = pygame.Surface((width, height))
+        overlay.set_alpha(128)
+        overlay.fill((0, 0, 0))
+        screen.blit(overlay, (0, 0))
+
+        font, small_font = self.app.fonts.get(None, 48), self.app.fonts.get(None, 24)
+        game_over_text = self.app.text_cache.render(font, "Game Over", (255, 0, 0))
+        money_text = small_font.render(f"Money: {self.sim.player_money}", True, (255, 255, 255))
+        hint_text = self.app.text_cache.render(small_font, "Click to continue", (200, 200, 200))
+        y = height // 2 - game_over_text.get_height() // 2
+        for text in (game_over_text, money_text, hint_text):
+            screen.blit(text, (width // 2 - text.get_width() // 2, y))
+            y += text.get_height() + 12
+        pygame.display.update()
+
+    def update(self, dt, events):
+        if any(event.type in (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN) for event in events):
+            self.app.pop()
@@ -0,0 +1,89 @@
+import heapq
+
+
+# Due times within this many ms of the current time count as due,
+# so a timer set for exactly N ticks ahead isn't pushed one tick
+# late by float rounding in the accumulated simulation time
+TIME_EPSILON = 1e-6
+
+
+# -----------------------------------------------------------
+# CLASS: TimerScheduler
+# One-shot timers keyed by an int id, each due at an absolute
+# simulation time (ms). pop_due(now) returns the ids of every
+# timer that came due, so a tick costs time in proportion to
+# the timers that fire, not to how many are waiting.
+#
+#   timers.schedule(cell, now + 2000)
+#   for timer in timers.pop_due(now): ...
+#
+# Timers live in a binary heap. Rescheduling or cancelling a
+# timer doesn't search the heap: timers maps each id to the
+# sequence number of its live entry, and stale entries are
+# skipped when they reach the top. Ties in due time fire in the
+# order they were scheduled.
+# -----------------------------------------------------------
+class TimerScheduler:
+    def __init__(self):
+        self.heap = []  # (due, seq, timer)
+        self.timers = {}  # timer -> (due, seq) of its live heap entry
+        self.seq = 0
+        self.now = 0  # time of the last pop_due, for scheduling relative to it
+
+    def __len__(self):
+        return len(self.timers)
+
+    def __contains__(self, timer):
+        return timer in self.timers
+
+    def schedule(self, timer, due):
+        # Replaces the timer's previous due time, if any
+        self.seq += 1
+        self.timers[timer] = (due, self.seq)
+        heapq.heappush(self.heap, (due, self.seq, timer))
+        # Drop stale entries once they outnumber the live ones
+        if len(self.heap) > 2 * len(self.timers) + 64:
+            self._compact()
+
+    def cancel(self, timer):
+        self.timers.pop(timer, None)
+
+    def due_time(self, timer):
+        entry = self.timers.get(timer)
+        return entry[0] if entry is not None else None
+
+    def pop_due(self, now):
+        self.now = now
+        heap, timers = self.heap, self.timers
+        limit = now + TIME_EPSILON
+        fired = []
+        while heap and heap[0][0] <= limit:
+            due, seq, timer = heapq.heappop(heap)
+            entry = timers.get(timer)
+            if entry is not None and entry[1] == seq:
+                del timers[timer]
+                fired.append(timer)
+        return fired
+
+    def pending(self):
+        # [(timer, due)] of the live timers in firing order, e.g. for
+        # snapshots; scheduling them again in this order keeps ties intact
+        entries = sorted((due, seq, timer) for timer, (due, seq) in self.timers.items())
+        return [(timer, due) for due, _, timer in entries]
+
+    def load(self, pending):
+        # Replaces every timer with pending, [(timer, due)] in firing
+        # order as pending() returns it, in one heapify
+        self.heap = [(due, seq, timer) for seq, (timer, due) in enumerate(pending, 1)]
+        self.timers = {timer: (due, seq) for due, seq, timer in self.heap}
+        self.seq = len(self.heap)
+        heapq.heapify(self.heap)
+
+    def clear(self):
+        self.heap.clear()
+        self.timers.clear()
+        self.now = 0
+
+    def _compact(self):
+        self.heap = [(due, seq, timer) for timer, (due, seq) in self.timers.items()]
+        heapq.heapify(self.heap)
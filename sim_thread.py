@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import deque
+
+from simulation import TickInput
+from timestep import FixedTimestep
+
+
+# -----------------------------------------------------------
+# CLASS: SimThread
+# Runs a simulation on its own thread at a fixed rate (sim_hz),
+# independent of how long frames take to draw and present.
+#
+# - The render thread hands over input with submit(); clicks
+#   queue up until the next tick, like GameScene's own loop.
+# - After each batch of ticks the thread publishes a fresh
+#   RenderState. Two are kept (the one being drawn and the
+#   newest), and latest() swaps in the newest complete one with
+#   the interpolation alpha for the moment it's drawn.
+# - call(fn) runs fn on the sim thread between ticks, for
+#   anything else that touches the simulation (snapshots).
+#
+# step(dt, tick_input) advances the game one tick (it may also
+# record, capture rewind snapshots, ...); capture() returns the
+# RenderState for the current tick. An exception on the sim
+# thread stops it and is raised again by check().
+# -----------------------------------------------------------
+class SimThread:
+    def __init__(self, step, capture, sim_hz=60, max_steps=5):
+        self.step = step
+        self.capture = capture
+        self.timestep = FixedTimestep(sim_hz, max_steps)
+        self.step_ms = self.timestep.step_ms
+
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.mouse_pos = self.pickup_pos = (0, 0)
+        self.pending_buttons = []
+        self.calls = deque()
+
+        # Double buffer: front is what the renderer draws, back is the
+        # newest published state; *_time is when its tick was due
+        self.front = self.back = capture()
+        self.front_time = self.back_time = time.perf_counter()
+
+        self.thread = None
+        self.running = False
+        self.error = None
+        self.tick_ms = 0.0  # how long the last batch of ticks took
+        self.phase_mark = None  # FrameProfiler hook; unused, sim phases run on the sim thread
+
+    # -----------------------------------------------------------
+    # RENDER THREAD SIDE
+    # -----------------------------------------------------------
+    def start(self):
+        if self.thread is not None:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="simulation", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.running = False
+        self.wake.set()
+        self.thread.join()
+        self.thread = None
+        self.check()
+
+    def check(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise RuntimeError("simulation thread failed") from error
+
+    def submit(self, mouse_pos, buttons, pickup_pos=None):
+        with self.lock:
+            self.mouse_pos = mouse_pos
+            self.pickup_pos = mouse_pos if pickup_pos is None else pickup_pos
+            self.pending_buttons.extend(buttons)
+
+    def drop_input(self):
+        # Forgets clicks not yet handed to a tick (e.g. after a rewind)
+        with self.lock:
+            self.pending_buttons = []
+
+    def call(self, fn):
+        self.calls.append(fn)
+        self.wake.set()
+
+    def entity_counts(self):
+        return self.front.counts
+
+    def latest(self):
+        # (RenderState, alpha) to draw now
+        with self.lock:
+            self.front, self.front_time = self.back, self.back_time
+        alpha = (time.perf_counter() - self.front_time) * 1000 / self.step_ms
+        return self.front, min(max(alpha, 0.0), 1.0)
+
+    # -----------------------------------------------------------
+    # SIM THREAD SIDE
+    # -----------------------------------------------------------
+    def _run(self):
+        timestep, step_ms = self.timestep, self.step_ms
+        try:
+            last = time.perf_counter()
+            while self.running:
+                self.wake.clear()
+                while self.calls:
+                    self.calls.popleft()()
+                    last = time.perf_counter()  # a call may have reset the timestep
+
+                now = time.perf_counter()
+                steps = timestep.advance((now - last) * 1000)
+                last = now
+                if steps:
+                    with self.lock:
+                        mouse_pos, pickup_pos, buttons = self.mouse_pos, self.pickup_pos, self.pending_buttons
+                        self.pending_buttons = []
+                    for _ in range(steps):
+                        self.step(step_ms, TickInput(mouse_pos, buttons, pickup_pos))
+                        buttons = ()
+                    state = self.capture()
+                    tick_time = now - timestep.accumulator / 1000
+                    with self.lock:
+                        self.back, self.back_time = state, tick_time
+                    self.tick_ms = (time.perf_counter() - now) * 1000
+
+                # Sleep until the next tick is due (or a call/stop wakes us)
+                self.wake.wait(max(step_ms - timestep.accumulator, 0.0) / 1000)
+        except BaseException as e:
+            self.error = e
+            self.running = False
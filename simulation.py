@@ -0,0 +1,479 @@
+import random
+import time
+from bisect import insort
+from operator import attrgetter
+
+from components import ComponentTable, HandleAllocator
+from event_log import event_log
+from entities import PlaceableItem, ALIEN_SPEED, BALL_PICKUP_RADIUS, BALL_MAX_SPEED
+from layout import GridLayout
+from pools import EntityPools
+from scheduler import TimerScheduler
+from spatial_hash import SpatialHash
+from tower_grid import TowerGrid
+
+
+# -----------------------------------------------------------
+# INPUT CODES
+# Mouse button transitions that happened during one tick.
+# -----------------------------------------------------------
+INPUT_MOUSE_DOWN = 1
+INPUT_MOUSE_UP = 2
+
+# Seeds are 0 <= seed < SEED_LIMIT: snapshots and recordings
+# store them as unsigned 64-bit, and random ones are 32-bit
+SEED_LIMIT = 2 ** 32
+
+
+# -----------------------------------------------------------
+# CLASS: TickInput
+# Player input for one simulation tick: the cursor position
+# and the button transitions (in order) since the last tick.
+# pickup_pos is where the cursor collects floating balls, when
+# that isn't mouse_pos (see Camera.pickup_pos).
+# -----------------------------------------------------------
+class TickInput:
+    def __init__(self, mouse_pos=(0, 0), buttons=(), pickup_pos=None):
+        self.mouse_pos = mouse_pos
+        self.buttons = list(buttons)
+        self.pickup_pos = mouse_pos if pickup_pos is None else pickup_pos
+
+
+NO_INPUT = TickInput()
+
+
+# -----------------------------------------------------------
+# TICK LENGTH
+# Movement speeds (px per tick) and hit-flash lengths are tuned
+# for 60 Hz ticks; a step of dt ms moves things dt / BASE_TICK_MS
+# times as far, so balance doesn't depend on the tick rate.
+# -----------------------------------------------------------
+BASE_TICK_MS = 1000 / 60
+
+
+# -----------------------------------------------------------
+# TIMER IDS
+# The simulation's own timers in its TimerScheduler. Towers use
+# their (non-negative) cell index as their timer id.
+# -----------------------------------------------------------
+TIMER_PHASE_SWITCH = -1  # alien waves: spawning phase <-> break
+TIMER_ALIEN_SPAWN = -2  # next alien, while a spawning phase is on
+TIMER_BALL_SPAWN = -3  # next natural mineral
+
+
+# Sort keys for the per-lane laser sweep
+_lane_order = attrgetter("row", "x")
+_x = attrgetter("x")
+
+
+# -----------------------------------------------------------
+# CLASS: Simulation
+# Owns all game state (aliens, lasers, balls, towers, money,
+# timers) and advances it with step(dt, inputs). Has no
+# dependency on the pygame display, so it can run headless.
+# -----------------------------------------------------------
+class Simulation:
+    def __init__(self, layout=None, seed=None):
+        self.layout = layout or GridLayout()
+        layout = self.layout
+
+        # Every random decision (spawn rows, spacing, ball start positions
+        # and velocities) comes from this one seeded stream, so a seed plus
+        # the recorded inputs reproduce a game exactly
+        self.seed = seed if seed is not None else random.randrange(SEED_LIMIT)
+        self.rng = random.Random(self.seed)
+
+        # Each row stores a list of active aliens in that lane
+        self.aliens_by_row = [[] for _ in range(layout.num_rows)]
+
+        # Stable handles for every entity, and per-alien attack state
+        # (timer + tower handle being attacked) keyed by alien handle
+        self.handles = HandleAllocator()
+        self.attacks = ComponentTable("attack_timer", "target")
+
+        # Every timed event (alien waves, spawns, tower shots and balls)
+        # is a timer in here; step() fires the ones that are due. The
+        # sim's own timers are set up on the first step, so balance
+        # constants can still be changed after construction.
+        self.timers = TimerScheduler()
+        self.due_towers = []  # cells whose tower timers fired this tick
+        self.alien_spawn_due = False
+        self.ball_spawn_due = False
+
+        self.spawn_interval = 500
+        self.last_alien_spawn = float("-inf")
+        self.spawn_phase_duration = 2000
+        self.break_phase_duration = 6000
+        self.spawning_active = False
+        self.alien_spawn_delay = 11000  # 11 seconds
+
+        # Placed towers, one per grid cell
+        self.pools = EntityPools()
+        self.towers = TowerGrid(layout, self.handles, self.pools, self.rng, self.timers)
+
+        # Draggable item buttons
+        self.item_blue = PlaceableItem(layout.margin_sides + 20, 40, layout.cell_width // 2, layout.cell_height // 2, "blue")
+        self.item_black = PlaceableItem(layout.margin_sides + 120, 40, layout.cell_width // 2, layout.cell_height // 2, "black")
+
+        # Player starting money
+        self.player_money = 0
+
+        # Ball spawning system. ball_hash buckets the balls by position
+        # for pickup and other pointer queries; _update_balls keeps it
+        # in step with the list (loosely, see SpatialHash).
+        self.balls = []
+        self.ball_hash = SpatialHash(cell_size=64)
+        self.ball_spawn_interval = 4750  # 3s + 0.5s = 3.5s; the first mineral spawns instantly
+        self.natural_balls = True  # False: no natural minerals at all, not even the first
+
+        # Laser system
+        self.lasers = []
+
+        self.mouse_pos = (0, 0)
+        self.pickup_pos = (0, 0)  # where the cursor collects balls (see TickInput)
+        self.time = 0  # simulated milliseconds since the game started
+        self.ticks = 0  # step() calls since the game started
+        self.game_over = False
+        self.game_over_time = None
+        self.game_over_duration = 3000  # how long the game over screen stays up
+        self.aliens_killed = 0
+
+        self.phase_mark = None  # optional callable(phase_name), see step()
+
+    @property
+    def finished(self):
+        return self.game_over and self.time - self.game_over_time > self.game_over_duration
+
+    def entity_counts(self):
+        return {
+            "aliens": sum(len(row_aliens) for row_aliens in self.aliens_by_row),
+            "lasers": len(self.lasers),
+            "balls": len(self.balls),
+            "towers": len(self.towers),
+        }
+
+    # -----------------------------------------------------------
+    # STEP: advance the whole game by dt milliseconds
+    # -----------------------------------------------------------
+    def step(self, dt, inputs=NO_INPUT):
+        self.ticks += 1
+        self.time += dt
+        if self.ticks == 1:
+            self._start_timers()
+
+        self.due_towers = []
+        self.alien_spawn_due = self.ball_spawn_due = False
+        if not self.game_over:
+            self._fire_timers()
+
+        # phase_mark (None unless a profiler or benchmark is attached) is
+        # called with each phase's name right after the phase finishes
+        mark = self.phase_mark
+        self._handle_input(inputs)
+        if mark is not None:
+            mark("events")
+        self._update_aliens(dt)
+        if mark is not None:
+            mark("aliens")
+        self._spawn_aliens()
+        if mark is not None:
+            mark("spawning")
+        self._update_lasers(dt)
+        if mark is not None:
+            mark("lasers")
+        self._update_balls(dt)
+        if mark is not None:
+            mark("balls")
+
+    # -----------------------------------------------------------
+    # TIMERS: pop what's due; the phases below act on it
+    # -----------------------------------------------------------
+    def _start_timers(self):
+        timers = self.timers
+        timers.schedule(TIMER_PHASE_SWITCH, self.alien_spawn_delay)
+        if self.natural_balls:
+            timers.schedule(TIMER_BALL_SPAWN, 0)
+
+    def _fire_timers(self):
+        timers, now = self.timers, self.time
+        # A phase switch can start a spawn that is due right away, so
+        # keep popping until nothing more is due
+        fired = timers.pop_due(now)
+        while fired:
+            for timer in fired:
+                if timer >= 0:
+                    self.due_towers.append(timer)
+                elif timer == TIMER_ALIEN_SPAWN:
+                    self.alien_spawn_due = True
+                elif timer == TIMER_BALL_SPAWN:
+                    self.ball_spawn_due = True
+                elif timer == TIMER_PHASE_SWITCH:
+                    self._switch_phase(now)
+            fired = timers.pop_due(now)
+
+    def _switch_phase(self, now):
+        timers = self.timers
+        self.spawning_active = not self.spawning_active
+        if self.spawning_active:
+            timers.schedule(TIMER_PHASE_SWITCH, now + self.spawn_phase_duration)
+            timers.schedule(TIMER_ALIEN_SPAWN, max(now, self.last_alien_spawn + self.spawn_interval))
+        else:
+            timers.schedule(TIMER_PHASE_SWITCH, now + self.break_phase_duration)
+            timers.cancel(TIMER_ALIEN_SPAWN)
+
+    def _handle_input(self, inputs):
+        item_blue, item_black = self.item_blue, self.item_black
+        mouse_x, mouse_y = inputs.mouse_pos
+        for button in inputs.buttons:
+            if button == INPUT_MOUSE_DOWN:
+                if item_blue.x <= mouse_x <= item_blue.x + item_blue.width and item_blue.y <= mouse_y <= item_blue.y + item_blue.height:
+                    item_blue.start_drag()
+                elif item_black.x <= mouse_x <= item_black.x + item_black.width and item_black.y <= mouse_y <= item_black.y + item_black.height:
+                    item_black.start_drag()
+
+            elif button == INPUT_MOUSE_UP:
+                if item_blue.dragging:
+                    self.player_money = item_blue.stop_drag(self.towers, *self.layout.grid_args(), self.player_money)
+                if item_black.dragging:
+                    self.player_money = item_black.stop_drag(self.towers, *self.layout.grid_args(), self.player_money)
+
+        self.mouse_pos = inputs.mouse_pos
+        self.pickup_pos = inputs.pickup_pos
+        item_blue.update_position(self.mouse_pos)
+        item_black.update_position(self.mouse_pos)
+
+    # -----------------------------------------------------------
+    # ALIENS: attack placed items, move, and check for game over
+    # -----------------------------------------------------------
+    def _update_aliens(self, dt):
+        towers = self.towers
+        alien_pool = self.pools.aliens
+        attacks = self.attacks
+        slots = attacks.slots
+        attack_timers = attacks.columns["attack_timer"]
+        targets = attacks.columns["target"]
+        scale = dt / BASE_TICK_MS
+        for row in range(self.layout.num_rows):
+            row_aliens = self.aliens_by_row[row]
+            for a in row_aliens:
+                # Find collision with a placed tower (blue or black) in the cells this alien covers
+                hit_cell = towers.find_blocking(row, a.x, a.y, a.width, a.height)
+                if hit_cell is not None:
+                    # Stop alien and attack. A new target is hit immediately.
+                    target = towers.handles[hit_cell]
+                    slot = slots.get(a.handle)
+                    if slot is None or targets[slot] != target:
+                        slot = attacks.add(a.handle, attack_timer=1250, target=target)
+                    a.speed = 0
+                    attack_timers[slot] += dt
+                    while attack_timers[slot] >= 1250:
+                        attack_timers[slot] -= 1250
+                        if towers.damage(hit_cell):
+                            break  # destroyed; the alien moves on next tick
+                else:
+                    # Resume movement
+                    a.speed = ALIEN_SPEED
+                    attacks.discard(a.handle)
+                a.update(scale)
+                if a.x <= 0 and not self.game_over:
+                    self.game_over = True
+                    self.game_over_time = self.time
+
+            # Remove aliens that have gone off screen, keeping the lane
+            # sorted by x for the laser sweep and view culling. Aliens
+            # rarely pass each other, so the sort is close to linear.
+            kept = []
+            for a in row_aliens:
+                if a.is_off_screen():
+                    attacks.discard(a.handle)
+                    alien_pool.release(a)
+                else:
+                    kept.append(a)
+            kept.sort(key=_x)
+            self.aliens_by_row[row] = kept
+
+    def _spawn_aliens(self):
+        # Spawn a new alien periodically while active
+        layout = self.layout
+        if self.alien_spawn_due and not self.game_over and self.spawning_active:
+            self.last_alien_spawn = self.time
+            self.timers.schedule(TIMER_ALIEN_SPAWN, self.time + self.spawn_interval)
+            random_row = self.rng.randint(0, layout.num_rows - 1)
+            row_aliens = self.aliens_by_row[random_row]
+
+            if not row_aliens or row_aliens[-1].x < layout.board_width - self.rng.randint(layout.cell_width, layout.cell_width * 3):
+                alien = self.pools.aliens.acquire(random_row, layout.cell_width, layout.cell_height, layout.grid_origin_x, layout.grid_origin_y,
+                                                  layout.board_width)
+                alien.handle = self.handles.new()
+                # Usually the rightmost alien, but aliens can also start
+                # further right (see benchmark.py)
+                insort(row_aliens, alien, key=_x)
+
+    # -----------------------------------------------------------
+    # LASERS: move, collide with aliens, fire from blue items
+    # -----------------------------------------------------------
+    def _update_lasers(self, dt):
+        lasers = self.lasers
+        # Update lasers, keeping the list sorted by (row, x) so each lane is
+        # one contiguous run. Lasers barely change order between ticks, so
+        # the sort is close to linear.
+        scale = dt / BASE_TICK_MS
+        for laser in lasers:
+            laser.update(scale)
+        lasers.sort(key=_lane_order)
+
+        # Check laser-alien collisions with one sweep per lane, then drop
+        # spent and off-screen lasers in a single compaction
+        kept = []
+        start, count = 0, len(lasers)
+        while start < count:
+            row = lasers[start].row
+            end = start + 1
+            while end < count and lasers[end].row == row:
+                end += 1
+            self._sweep_lane(lasers, start, end, row, kept)
+            start = end
+        lasers[:] = kept
+
+        # Shoot lasers from blue items, merging the new ones into (row, x)
+        # order so the list stays sorted between ticks
+        if self.due_towers and not self.game_over:
+            self.towers.shoot_lasers(self.due_towers, lasers, self.time)
+            lasers.sort(key=_lane_order)
+
+    def _sweep_lane(self, lasers, start, end, row, kept):
+        # Merge-style sweep of the lane's lasers (sorted by x) against its
+        # aliens (sorted by x). Collisions are swept: a laser hits the
+        # first live alien it touched anywhere between its previous and
+        # current position, so large steps (low sim rate, fast lasers)
+        # can't skip over an alien. Aliens entirely left of a laser's
+        # previous position are also left of every later laser, so the
+        # alien cursor only moves forward.
+        # _update_aliens left the lane sorted and _spawn_aliens inserts
+        # in x order, so it is still sorted here
+        aliens = self.aliens_by_row[row]
+        num_aliens = len(aliens)
+        laser_pool = self.pools.lasers
+        board_width = self.layout.board_width
+        # Furthest any alien in the lane moved this tick
+        moved = max([a.prev_x - a.x for a in aliens], default=0.0)
+        first = 0
+        killed = False
+        for k in range(start, end):
+            laser = lasers[k]
+            while first < num_aliens and aliens[first].x + aliens[first].width + moved <= laser.prev_x:
+                first += 1
+
+            # Live alien this laser touched earliest during the tick, if any
+            hit = None
+            hit_time = 2.0
+            j = first
+            while j < num_aliens and aliens[j].x < laser.x + laser.width:
+                a = aliens[j]
+                if a.health > 0:
+                    t = laser.contact_time(a)
+                    if t is not None and t < hit_time:
+                        hit, hit_time = a, t
+                        if t == 0.0:
+                            break
+                j += 1
+
+            if hit is None:
+                if laser.is_off_screen(board_width):
+                    laser_pool.release(laser)
+                else:
+                    kept.append(laser)
+                continue
+            laser_pool.release(laser)
+            hit.hit()
+            if hit.health <= 0:
+                killed = True
+                self.aliens_killed += 1
+
+        if killed:
+            survivors = []
+            for a in aliens:
+                if a.health > 0:
+                    survivors.append(a)
+                else:
+                    self.attacks.discard(a.handle)
+                    self.pools.aliens.release(a)
+            self.aliens_by_row[row] = survivors
+
+    # -----------------------------------------------------------
+    # FLOATING BALLS: spawn, move, and collect under the cursor
+    # -----------------------------------------------------------
+    def _update_balls(self, dt):
+        balls = self.balls
+        ball_hash = self.ball_hash
+        first_new = len(balls)
+        if self.ball_spawn_due and not self.game_over:
+            self.timers.schedule(TIMER_BALL_SPAWN, self.time + self.ball_spawn_interval)
+            if __debug__ and event_log.debug_enabled:
+                event_log.debug("spawn", "natural mineral spawned", sim_time=self.time)
+            ball = self.pools.balls.acquire(self.rng, self.layout.board_width, self.layout.board_height)
+            ball.handle = self.handles.new()
+            balls.append(ball)
+
+        if self.due_towers and not self.game_over:
+            self.towers.spawn_balls(self.due_towers, balls, self.time)
+
+        for k in range(first_new, len(balls)):
+            ball_hash.insert(balls[k])
+
+        scale = dt / BASE_TICK_MS
+        board_width, board_height = self.layout.board_width, self.layout.board_height
+        for ball in balls:
+            ball.update(scale, board_width, board_height)
+
+        # Balls stay in the cell they were bucketed in until they may
+        # have drifted half a cell; until then queries look that much
+        # further instead of re-bucketing every ball every tick
+        ball_hash.slack += BALL_MAX_SPEED * scale
+        if ball_hash.slack > ball_hash.cell_size / 2:
+            ball_hash.rebuild(balls)
+
+        # Collect the balls close to the mouse cursor; only the cells
+        # around the cursor are searched
+        mouse_x, mouse_y = self.pickup_pos
+        collected = ball_hash.query_radius(mouse_x, mouse_y, BALL_PICKUP_RADIUS)
+        if collected:
+            self.player_money += 5 * len(collected)
+            for ball in collected:
+                ball_hash.remove(ball)
+            # One pass to drop them, keeping the rest in order
+            balls[:] = [ball for ball in balls if ball in ball_hash]
+            self.pools.balls.release_all(collected)
+
+
+# -----------------------------------------------------------
+# FUNCTION: run_headless
+# Steps a simulation as fast as possible for num_ticks ticks
+# of dt milliseconds each. Returns the simulation.
+# -----------------------------------------------------------
+def run_headless(num_ticks, dt=1000 / 60, sim=None, inputs=NO_INPUT):
+    sim = sim or Simulation()
+    for _ in range(num_ticks):
+        sim.step(dt, inputs)
+    return sim
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the game simulation headless.")
+    parser.add_argument("--ticks", type=int, default=60 * 60 * 10)
+    parser.add_argument("--dt", type=float, default=1000 / 60)
+    parser.add_argument("--arrays", action="store_true", help="use the NumPy-backed ArraySimulation")
+    args = parser.parse_args()
+
+    sim = None
+    if args.arrays:
+        from entity_store import ArraySimulation
+        sim = ArraySimulation()
+
+    start = time.perf_counter()
+    sim = run_headless(args.ticks, args.dt, sim)
+    elapsed = time.perf_counter() - start
+    print(f"{args.ticks} ticks in {elapsed:.2f}s ({args.ticks / elapsed:.0f} ticks/s), "
+          f"game over: {sim.game_over}, money: {sim.player_money}")
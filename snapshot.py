@@ -0,0 +1,348 @@
+import math
+import struct
+import sys
+import zlib
+from array import array
+from collections import deque
+
+from layout import layout_from_config
+from simulation import Simulation
+
+
+# -----------------------------------------------------------
+# FILE FORMAT (little-endian, version 4)
+#   header:  magic b"SVAS", version (H), backend (B: 0 objects,
+#            1 arrays), then the grid as GridLayout.config() gives
+#            it: columns, rows, cell width, cell height (4 x H)
+#   state:   _STATE fields (clock, last alien spawn, money, game
+#            over, handle counter, cursor)
+#   config:  _CONFIG fields (balance constants, so a sweep's
+#            modified sim restores as it was)
+#   items:   _ITEM for the blue then the black drag button
+#   rng:     624 x uint32 Mersenne Twister words, index (I),
+#            gauss_next (d, NaN if unset)
+#   towers:  the TowerGrid's per-cell arrays, then the placement
+#            order (count I + cells as int32)
+#   timers:  pending TimerScheduler timers in firing order: count
+#            (I), then ids (int64) and due times (double)
+#   tables:  aliens, lasers, balls; each is a count (I) followed
+#            by one packed column per field in *_COLUMNS
+# Everything is raw array/struct data, so dump and restore are
+# a handful of bulk copies rather than pickling object graphs.
+# Files on disk are zlib-compressed.
+# -----------------------------------------------------------
+SNAPSHOT_MAGIC = b"SVAS"
+SNAPSHOT_VERSION = 4
+BACKEND_OBJECTS = 0
+BACKEND_ARRAYS = 1
+
+_HEADER = struct.Struct("<4sHBHHHH")
+_STATE = struct.Struct("<QqdddqdqqBBdd")
+_CONFIG = struct.Struct("<dddddddiiiiB")
+_ITEM = struct.Struct("<ddB")
+_RNG_TAIL = struct.Struct("<Id")
+_COUNT = struct.Struct("<I")
+
+# (field, array typecode); matches ArraySimulation's store dtypes
+ALIEN_COLUMNS = (
+    ("handle", "q"), ("row", "i"), ("x", "d"), ("prev_x", "d"), ("y", "d"), ("speed", "d"),
+    ("health", "i"), ("alpha", "i"), ("hit_timer", "d"), ("attack_timer", "d"), ("target", "q"),
+)
+LASER_COLUMNS = (("handle", "q"), ("row", "i"), ("x", "d"), ("prev_x", "d"), ("y", "d"))
+BALL_COLUMNS = (("handle", "q"), ("x", "d"), ("y", "d"), ("prev_x", "d"), ("prev_y", "d"), ("dx", "d"), ("dy", "d"))
+
+_NUMPY_TYPES = {"q": "<i8", "i": "<i4", "d": "<f8"}
+_BIG_ENDIAN = sys.byteorder != "little"
+
+
+def _is_array_sim(sim):
+    return hasattr(sim, "alien_store")
+
+
+def _column_bytes(typecode, values):
+    column = array(typecode, values)
+    if _BIG_ENDIAN:
+        column.byteswap()
+    return column.tobytes()
+
+
+# -----------------------------------------------------------
+# FUNCTION: dump
+# Serializes a Simulation or ArraySimulation to bytes.
+# -----------------------------------------------------------
+def dump(sim):
+    layout, towers = sim.layout, sim.towers
+    backend = BACKEND_ARRAYS if _is_array_sim(sim) else BACKEND_OBJECTS
+    parts = [_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, backend, *layout.config())]
+
+    mouse_x, mouse_y = sim.mouse_pos
+    parts.append(_STATE.pack(
+        sim.seed, sim.ticks, sim.time, sim.last_alien_spawn,
+        math.nan if sim.game_over_time is None else sim.game_over_time, sim.player_money,
+        sim.game_over_duration, sim.aliens_killed, sim.handles.next_handle,
+        sim.spawning_active, sim.game_over, mouse_x, mouse_y,
+    ))
+    parts.append(_CONFIG.pack(
+        sim.spawn_interval, sim.spawn_phase_duration, sim.break_phase_duration, sim.alien_spawn_delay,
+        sim.ball_spawn_interval, towers.shoot_interval, towers.ball_interval,
+        sim.item_blue.cost, sim.item_black.cost, *(towers.tower_health[t] for t in sorted(towers.tower_health)),
+        sim.natural_balls,
+    ))
+    for item in (sim.item_blue, sim.item_black):
+        parts.append(_ITEM.pack(item.x, item.y, item.dragging))
+
+    _, internal, gauss_next = sim.rng.getstate()
+    parts.append(_column_bytes("I", internal[:624]))
+    parts.append(_RNG_TAIL.pack(internal[624], math.nan if gauss_next is None else gauss_next))
+
+    for column in (towers.types, towers.handles, towers.health):
+        parts.append(_column_bytes(column.typecode, column))
+    parts.append(_COUNT.pack(len(towers.occupied)))
+    parts.append(_column_bytes("i", towers.occupied))
+
+    pending = sim.timers.pending()
+    parts.append(_COUNT.pack(len(pending)))
+    parts.append(_column_bytes("q", [timer for timer, _ in pending]))
+    parts.append(_column_bytes("d", [due for _, due in pending]))
+
+    if backend == BACKEND_ARRAYS:
+        for store, columns in ((sim.alien_store, ALIEN_COLUMNS), (sim.laser_store, LASER_COLUMNS), (sim.ball_store, BALL_COLUMNS)):
+            parts.append(_COUNT.pack(store.count))
+            for name, typecode in columns:
+                parts.append(store[name].astype(_NUMPY_TYPES[typecode], copy=False).tobytes())
+    else:
+        aliens = [a for row_aliens in sim.aliens_by_row for a in row_aliens]
+        attacks = sim.attacks
+        parts.append(_COUNT.pack(len(aliens)))
+        for name, typecode in ALIEN_COLUMNS:
+            if name in ("attack_timer", "target"):
+                parts.append(_column_bytes(typecode, [attacks.get(a.handle, name, 0) for a in aliens]))
+            else:
+                parts.append(_column_bytes(typecode, [getattr(a, name) for a in aliens]))
+        for objs, columns in ((sim.lasers, LASER_COLUMNS), (sim.balls, BALL_COLUMNS)):
+            parts.append(_COUNT.pack(len(objs)))
+            for name, typecode in columns:
+                parts.append(_column_bytes(typecode, [getattr(o, name) for o in objs]))
+    return b"".join(parts)
+
+
+# -----------------------------------------------------------
+# CLASS: _Reader
+# Cursor over snapshot bytes. Reading past the end raises
+# ValueError, like every other problem with the snapshot.
+# -----------------------------------------------------------
+class _Reader:
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def unpack(self, fmt):
+        try:
+            values = fmt.unpack_from(self.data, self.offset)
+        except struct.error as e:
+            raise ValueError("corrupt snapshot: data ends early") from e
+        self.offset += fmt.size
+        return values
+
+    def column(self, typecode, count):
+        column = array(typecode)
+        size = column.itemsize * count
+        if self.offset + size > len(self.data):
+            raise ValueError("corrupt snapshot: data ends early")
+        column.frombytes(self.data[self.offset:self.offset + size])
+        self.offset += size
+        if _BIG_ENDIAN:
+            column.byteswap()
+        return column
+
+    def table(self, columns):
+        (count,) = self.unpack(_COUNT)
+        return count, {name: self.column(typecode, count) for name, typecode in columns}
+
+
+# -----------------------------------------------------------
+# FUNCTION: restore
+# Loads snapshot bytes into sim (in place, so renderers and
+# profilers attached to it keep working), or into a new sim of
+# the snapshot's backend and grid if sim is None. Returns the sim.
+# The whole snapshot is read before sim is changed, so one that
+# is cut short raises ValueError and leaves sim as it was.
+# -----------------------------------------------------------
+def restore(data, sim=None):
+    reader = _Reader(data)
+    magic, version, backend, *grid = reader.unpack(_HEADER)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("not a game snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"unsupported snapshot version {version}")
+
+    state = reader.unpack(_STATE)
+    seed = state[0]
+    if sim is None:
+        if backend == BACKEND_ARRAYS:
+            from entity_store import ArraySimulation
+            sim = ArraySimulation(layout_from_config(*grid), seed=seed)
+        else:
+            sim = Simulation(layout_from_config(*grid), seed=seed)
+    if (BACKEND_ARRAYS if _is_array_sim(sim) else BACKEND_OBJECTS) != backend:
+        raise ValueError("snapshot was taken from the other simulation backend")
+    layout, towers = sim.layout, sim.towers
+    if layout.config() != tuple(grid):
+        raise ValueError(f"snapshot grid (columns, rows, cell size) is {tuple(grid)}, simulation grid is {layout.config()}")
+
+    # Read everything...
+    config = reader.unpack(_CONFIG)
+    items = [reader.unpack(_ITEM) for _ in (sim.item_blue, sim.item_black)]
+    internal = reader.column("I", 624)
+    index, gauss_next = reader.unpack(_RNG_TAIL)
+    size = layout.num_rows * layout.num_columns
+    tower_columns = {name: reader.column(getattr(towers, name).typecode, size) for name in ("types", "handles", "health")}
+    (count,) = reader.unpack(_COUNT)
+    occupied = reader.column("i", count)
+    (count,) = reader.unpack(_COUNT)
+    timer_ids, due_times = reader.column("q", count), reader.column("d", count)
+    tables = [reader.table(columns) for columns in (ALIEN_COLUMNS, LASER_COLUMNS, BALL_COLUMNS)]
+    if reader.offset != len(reader.data):
+        raise ValueError("corrupt snapshot: unexpected data at the end")
+
+    # ...then apply it
+    (seed, ticks, time, last_alien_spawn, game_over_time, player_money,
+     game_over_duration, aliens_killed, next_handle, spawning_active, game_over, mouse_x, mouse_y) = state
+    sim.seed, sim.ticks, sim.time = seed, ticks, time
+    sim.last_alien_spawn = last_alien_spawn
+    sim.game_over_time = None if math.isnan(game_over_time) else game_over_time
+    sim.player_money, sim.game_over_duration, sim.aliens_killed = player_money, game_over_duration, aliens_killed
+    sim.handles.next_handle = next_handle
+    sim.spawning_active, sim.game_over = bool(spawning_active), bool(game_over)
+    sim.mouse_pos = (mouse_x, mouse_y)
+
+    (sim.spawn_interval, sim.spawn_phase_duration, sim.break_phase_duration, sim.alien_spawn_delay,
+     sim.ball_spawn_interval, towers.shoot_interval, towers.ball_interval,
+     sim.item_blue.cost, sim.item_black.cost, *health, natural_balls) = config
+    sim.natural_balls = bool(natural_balls)
+    for tower_type, value in zip(sorted(towers.tower_health), health):
+        towers.tower_health[tower_type] = value
+    for item, (x, y, dragging) in zip((sim.item_blue, sim.item_black), items):
+        item.x, item.y, item.dragging = x, y, bool(dragging)
+
+    for name, column in tower_columns.items():
+        getattr(towers, name)[:] = column
+    towers.occupied = dict.fromkeys(occupied)
+
+    sim.timers.load(zip(timer_ids, due_times))
+    sim.timers.now = time
+
+    if backend == BACKEND_ARRAYS:
+        import numpy as np
+        for store, columns, (count, values) in zip((sim.alien_store, sim.laser_store, sim.ball_store),
+                                                   (ALIEN_COLUMNS, LASER_COLUMNS, BALL_COLUMNS), tables):
+            store.load(count, {name: np.frombuffer(column, dtype=_NUMPY_TYPES[typecode])
+                               for (name, typecode), column in zip(columns, values.values())})
+    else:
+        _restore_objects(sim, tables)
+
+    # Last, since nothing above may draw from the restored stream
+    sim.rng.setstate((3, tuple(internal) + (index,), None if math.isnan(gauss_next) else gauss_next))
+    return sim
+
+
+def _restore_objects(sim, tables):
+    layout, pools = sim.layout, sim.pools
+
+    # Hand the current entities back to the pools, then rebuild from them
+    for row_aliens in sim.aliens_by_row:
+        pools.aliens.release_all(row_aliens)
+        row_aliens.clear()
+    pools.lasers.release_all(sim.lasers)
+    pools.balls.release_all(sim.balls)
+    sim.lasers.clear()
+    sim.balls.clear()
+    sim.attacks.clear()
+
+    alien_table, laser_table, ball_table = tables
+
+    # Every field is set from the tables, so the pooled objects skip reset()
+    count, c = alien_table
+    width = layout.cell_width // 2
+    aliens_by_row, attacks = sim.aliens_by_row, sim.attacks
+    rows = zip(*(c[name] for name, _ in ALIEN_COLUMNS))
+    for a, (handle, row, x, prev_x, y, speed, health, alpha, hit_timer, attack_timer, target) in zip(pools.aliens.take(count), rows):
+        a.handle, a.row, a.x, a.prev_x, a.y, a.speed = handle, row, x, prev_x, y, speed
+        a.width = a.height = width
+        a.health, a.alpha, a.hit_timer = health, alpha, hit_timer
+        if target:
+            attacks.add(handle, attack_timer=attack_timer, target=target)
+        aliens_by_row[row].append(a)
+
+    count, c = laser_table
+    lasers = pools.lasers.take(count)
+    for laser, handle, row, x, prev_x, y in zip(lasers, c["handle"], c["row"], c["x"], c["prev_x"], c["y"]):
+        laser.handle, laser.row, laser.x, laser.prev_x, laser.y = handle, row, x, prev_x, y
+        laser.width, laser.height, laser.speed = 10, 5, 5
+    sim.lasers.extend(lasers)
+
+    count, c = ball_table
+    balls = pools.balls.take(count)
+    for ball, handle, x, y, prev_x, prev_y, dx, dy in zip(balls, c["handle"], c["x"], c["y"], c["prev_x"], c["prev_y"], c["dx"], c["dy"]):
+        ball.handle, ball.x, ball.y, ball.prev_x, ball.prev_y, ball.dx, ball.dy = handle, x, y, prev_x, prev_y, dx, dy
+        ball.radius = 10
+    sim.balls.extend(balls)
+    sim.ball_hash.rebuild(sim.balls)
+
+
+# -----------------------------------------------------------
+# DISK: zlib-compressed snapshot files
+# -----------------------------------------------------------
+def save(sim, path):
+    with open(path, "wb") as f:
+        f.write(zlib.compress(dump(sim), 1))
+
+
+def load(path, sim=None):
+    # A damaged file fails zlib's checksum here, before sim is touched
+    with open(path, "rb") as f:
+        try:
+            data = zlib.decompress(f.read())
+        except zlib.error as e:
+            raise ValueError(f"corrupt snapshot: {e}") from e
+    return restore(data, sim)
+
+
+# -----------------------------------------------------------
+# CLASS: RewindBuffer
+# Ring buffer of the last `capacity` snapshots, one taken every
+# `interval` ticks by capture(). rewind(sim, steps) restores the
+# snapshot `steps` captures back and forgets the newer ones; a
+# snapshot of the tick sim is already at doesn't count, so
+# repeated rewinds keep going back.
+# -----------------------------------------------------------
+class RewindBuffer:
+    def __init__(self, capacity=120, interval=30):
+        self.capacity = capacity
+        self.interval = interval
+        self.snapshots = deque(maxlen=capacity)  # (tick, bytes)
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def capture(self, sim, force=False):
+        # Returns True if a snapshot was taken
+        if not force and self.snapshots and sim.ticks - self.snapshots[-1][0] < self.interval:
+            return False
+        self.snapshots.append((sim.ticks, dump(sim)))
+        return True
+
+    def rewind(self, sim, steps=1):
+        if len(self.snapshots) > 1 and self.snapshots[-1][0] >= sim.ticks:
+            self.snapshots.pop()
+        if not self.snapshots:
+            return None
+        steps = max(1, min(steps, len(self.snapshots)))
+        for _ in range(steps - 1):
+            self.snapshots.pop()
+        tick, data = self.snapshots[-1]
+        restore(data, sim)
+        return tick
+
+    def clear(self):
+        self.snapshots.clear()
@@ -0,0 +1,128 @@
+# -----------------------------------------------------------
+# CLASS: SpatialHash
+# Uniform grid over the plane for point-like objects (anything
+# with x and y attributes). Each object sits in the bucket of
+# the cell containing its position, so a radius or rect query
+# only looks at the handful of cells it overlaps instead of
+# every object.
+#
+#   balls = SpatialHash(cell_size=64)
+#   balls.insert(ball)
+#   for ball in balls.query_radius(mouse_x, mouse_y, 30): ...
+#   balls.remove(ball)
+#
+# Moving objects can be kept exact with move(obj) after each
+# position change, or the hash can be left loose: objects stay
+# in the bucket they were inserted into, the owner adds how far
+# any of them may have drifted since to `slack`, and queries
+# widen their cell range by that much (the distance tests
+# always use the current positions). rebuild() re-buckets
+# everything and resets slack. For many slow movers (the
+# floating balls) that skips all per-object work on most ticks.
+# -----------------------------------------------------------
+class SpatialHash:
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.inv_cell_size = 1.0 / cell_size
+        self.cells = {}  # (cell x, cell y) -> list of objects
+        self.keys = {}  # object -> its cell
+        self.slack = 0.0  # max distance any object moved since it was bucketed
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, obj):
+        return obj in self.keys
+
+    def _key(self, x, y):
+        # int() truncates toward zero, so cell 0 spans -cell_size..cell_size
+        # on each axis; keys still grow with x and y, which is all the
+        # range queries need, and int() is much cheaper than floor()
+        inv = self.inv_cell_size
+        return int(x * inv), int(y * inv)
+
+    # -----------------------------------------------------------
+    # UPDATES
+    # -----------------------------------------------------------
+    def insert(self, obj):
+        key = self._key(obj.x, obj.y)
+        self.keys[obj] = key
+        bucket = self.cells.get(key)
+        if bucket is None:
+            self.cells[key] = [obj]
+        else:
+            bucket.append(obj)
+
+    def remove(self, obj):
+        key = self.keys.pop(obj)
+        bucket = self.cells[key]
+        bucket.remove(obj)
+        if not bucket:
+            del self.cells[key]
+
+    def move(self, obj):
+        key = self._key(obj.x, obj.y)
+        if key != self.keys[obj]:
+            self.remove(obj)
+            self.keys[obj] = key
+            self.cells.setdefault(key, []).append(obj)
+
+    def rebuild(self, objs):
+        # insert() inlined, as this runs over every object at once
+        self.clear()
+        cells, keys, inv = self.cells, self.keys, self.inv_cell_size
+        for obj in objs:
+            key = int(obj.x * inv), int(obj.y * inv)
+            keys[obj] = key
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [obj]
+            else:
+                bucket.append(obj)
+
+    def clear(self):
+        self.cells.clear()
+        self.keys.clear()
+        self.slack = 0.0
+
+    # -----------------------------------------------------------
+    # QUERIES
+    # Results are in no particular order.
+    # -----------------------------------------------------------
+    def _candidates(self, left, top, right, bottom):
+        # Every bucketed object that may currently lie in the box
+        slack = self.slack
+        min_cx, min_cy = self._key(left - slack, top - slack)
+        max_cx, max_cy = self._key(right + slack, bottom + slack)
+        cells = self.cells
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    yield from bucket
+
+    def query_rect(self, left, top, width, height):
+        # Objects with left <= x <= left + width and top <= y <= top + height
+        right, bottom = left + width, top + height
+        return [obj for obj in self._candidates(left, top, right, bottom)
+                if left <= obj.x <= right and top <= obj.y <= bottom]
+
+    def query_radius(self, x, y, radius):
+        # Objects strictly closer than radius to (x, y), compared squared
+        radius_sq = radius * radius
+        found = []
+        for obj in self._candidates(x - radius, y - radius, x + radius, y + radius):
+            dx, dy = obj.x - x, obj.y - y
+            if dx * dx + dy * dy < radius_sq:
+                found.append(obj)
+        return found
+
+    def query_nearest(self, x, y, radius):
+        # Closest object strictly within radius of (x, y), or None
+        best, best_sq = None, radius * radius
+        for obj in self._candidates(x - radius, y - radius, x + radius, y + radius):
+            dx, dy = obj.x - x, obj.y - y
+            dist_sq = dx * dx + dy * dy
+            if dist_sq < best_sq:
+                best, best_sq = obj, dist_sq
+        return best
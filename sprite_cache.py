@@ -0,0 +1,66 @@
+from collections import OrderedDict
+
+import pygame
+
+
+# -----------------------------------------------------------
+# CLASS: SpriteCache
+# Shared cache of pre-filled surfaces keyed by shape, size,
+# color and alpha. Entities blit these instead of creating
+# and filling a new Surface every frame. Least recently used
+# entries are evicted once max_size is reached.
+# -----------------------------------------------------------
+class SpriteCache:
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, shape, width, height, color, alpha=255):
+        key = (shape, int(width), int(height), tuple(color), alpha)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        sprite = self._build(*key)
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.max_size:
+            self.sprites.popitem(last=False)
+        return sprite
+
+    def rect(self, width, height, color, alpha=255):
+        return self.get("rect", width, height, color, alpha)
+
+    def circle(self, radius, color, alpha=255):
+        return self.get("circle", radius * 2, radius * 2, color, alpha)
+
+    def clear(self):
+        self.sprites.clear()
+
+    def _build(self, shape, width, height, color, alpha):
+        if shape == "rect" and alpha == 255:
+            # Opaque rects don't need per-pixel alpha, which blits much faster
+            sprite = pygame.Surface((width, height))
+            sprite.fill(color)
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert()
+            return sprite
+
+        sprite = pygame.Surface((width, height), pygame.SRCALPHA)
+        if shape == "rect":
+            sprite.fill((*color, alpha))
+        elif shape == "circle":
+            pygame.draw.circle(sprite, (*color, alpha), (width // 2, height // 2), min(width, height) // 2)
+        else:
+            raise ValueError(f"unknown sprite shape: {shape}")
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()
+        return sprite
+
+
+# Shared by all entity classes
+sprite_cache = SpriteCache()
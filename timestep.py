@@ -0,0 +1,39 @@
+# -----------------------------------------------------------
+# CLASS: FixedTimestep
+# Accumulates real frame time and hands it out as a whole
+# number of fixed-length simulation ticks, so the simulation
+# runs at the same rate (sim_hz) whatever the frame rate is.
+#
+#   steps = timestep.advance(frame_ms)
+#   for _ in range(steps):
+#       sim.step(timestep.step_ms, inputs)
+#   renderer.draw(timestep.alpha)
+#
+# alpha is how far (0..1) real time has run into the next tick,
+# used to interpolate positions when drawing. If a frame would
+# need more than max_steps ticks (a long stall), the backlog is
+# dropped instead of trying to catch up.
+# -----------------------------------------------------------
+class FixedTimestep:
+    def __init__(self, sim_hz=60, max_steps=5):
+        self.sim_hz = sim_hz
+        self.step_ms = 1000 / sim_hz
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.dropped_ms = 0.0  # total time skipped after stalls
+
+    def advance(self, frame_ms):
+        self.accumulator += frame_ms
+        steps = int(self.accumulator // self.step_ms)
+        if steps > self.max_steps:
+            self.dropped_ms += (steps - self.max_steps) * self.step_ms
+            steps = self.max_steps
+        self.accumulator -= (self.accumulator // self.step_ms) * self.step_ms
+        return steps
+
+    @property
+    def alpha(self):
+        return self.accumulator / self.step_ms
+
+    def reset(self):
+        self.accumulator = 0.0
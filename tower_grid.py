@@ -0,0 +1,219 @@
+import random
+from array import array
+
+import pygame
+
+from components import HandleAllocator
+from event_log import event_log
+from pools import EntityPools
+from scheduler import TimerScheduler
+from sprite_cache import sprite_cache
+
+
+# -----------------------------------------------------------
+# TOWER TYPES
+# Type codes stored in TowerGrid.types (0 means empty cell).
+# -----------------------------------------------------------
+TOWER_EMPTY = 0
+TOWER_BLUE = 1
+TOWER_BLACK = 2
+
+TOWER_CODES = {"blue": TOWER_BLUE, "black": TOWER_BLACK}
+TOWER_NAMES = {TOWER_BLUE: "blue", TOWER_BLACK: "black"}
+TOWER_HEALTH = {TOWER_BLUE: 6, TOWER_BLACK: 5}  # blue: 6 hits, black: 5 hits
+TOWER_COLORS = {TOWER_BLUE: (0, 0, 255), TOWER_BLACK: (0, 0, 0)}
+
+
+# -----------------------------------------------------------
+# CLASS: TowerGrid
+# Fixed-size table of placed towers with one slot per grid cell
+# (num_rows x num_columns). Cell index = row * num_columns + col
+# never changes while a tower lives, so it can be held onto.
+# Type, handle and health are kept in flat typed arrays.
+# A tower's handle is unique for the whole game, unlike its cell,
+# which a later tower can reuse.
+#
+# Each tower has one timer in the shared TimerScheduler, keyed
+# by its cell: when it's due a blue tower shoots and a black
+# tower spawns a ball. Idle towers cost nothing per tick.
+#
+# Place, lookup and remove are O(1); only one tower per cell.
+# Also serves as the per-lane occupancy index for aliens.
+# -----------------------------------------------------------
+class TowerGrid:
+    def __init__(self, layout, handles=None, pools=None, rng=random, timers=None):
+        self.layout = layout
+        self.rng = rng
+        self.allocator = handles or HandleAllocator()
+        self.pools = pools or EntityPools()
+        self.timers = timers if timers is not None else TimerScheduler()
+        self.num_rows = layout.num_rows
+        self.num_columns = layout.num_columns
+        self.tower_width = layout.cell_width // 2
+        self.tower_height = layout.cell_height // 2
+
+        size = self.num_rows * self.num_columns
+        self.types = array("b", bytes(size))
+        self.handles = array("q", bytes(8 * size))  # stable tower id per cell (0 = empty)
+        self.health = array("i", bytes(4 * size))
+        self.occupied = {}  # cell -> None, in placement order
+
+        # Balance constants (per grid, so batch runs can vary them)
+        self.tower_health = dict(TOWER_HEALTH)
+        self.ball_interval = 6500  # black towers: 5.25s + 1.25s = 6.5s per ball
+        self.shoot_interval = 2000  # blue towers: fire every 2s (slower)
+
+    def __len__(self):
+        return len(self.occupied)
+
+    # -----------------------------------------------------------
+    # CELL ADDRESSING
+    # -----------------------------------------------------------
+    def cell(self, row, col):
+        return row * self.num_columns + col
+
+    def row_col(self, cell):
+        return divmod(cell, self.num_columns)
+
+    def position(self, cell):
+        # Top-left pixel position of the tower in a cell
+        layout = self.layout
+        row, col = self.row_col(cell)
+        x = layout.grid_origin_x + col * layout.cell_width + (layout.cell_width - self.tower_width) // 2
+        y = layout.grid_origin_y + row * layout.cell_height + (layout.cell_height - self.tower_height) // 2
+        return x, y
+
+    def is_occupied(self, cell):
+        return self.types[cell] != TOWER_EMPTY
+
+    def cells_of_type(self, tower_type):
+        types = self.types
+        return [cell for cell in self.occupied if types[cell] == tower_type]
+
+    def interval(self, tower_type):
+        # ms between a tower's shots (blue) or balls (black)
+        return self.shoot_interval if tower_type == TOWER_BLUE else self.ball_interval
+
+    # -----------------------------------------------------------
+    # PLACE / DAMAGE / REMOVE
+    # -----------------------------------------------------------
+    def place(self, row, col, tower_name):
+        # Returns False (and places nothing) if the cell is taken
+        tower_type = TOWER_CODES[tower_name]
+        cell = self.cell(row, col)
+        if self.types[cell] != TOWER_EMPTY:
+            return False
+        self.types[cell] = tower_type
+        self.handles[cell] = self.allocator.new()
+        self.health[cell] = self.tower_health[tower_type]
+        self.occupied[cell] = None
+        timers = self.timers
+        timers.schedule(cell, timers.now + self.interval(tower_type))
+        return True
+
+    def damage(self, cell, amount=1):
+        # Returns True if this destroyed the tower
+        if self.types[cell] == TOWER_EMPTY:
+            return False
+        self.health[cell] -= amount
+        if self.health[cell] <= 0:
+            self.remove(cell)
+            return True
+        return False
+
+    def remove(self, cell):
+        self.types[cell] = TOWER_EMPTY
+        self.handles[cell] = 0
+        self.health[cell] = 0
+        del self.occupied[cell]
+        self.timers.cancel(cell)
+
+    def clear(self):
+        for cell in list(self.occupied):
+            self.remove(cell)
+
+    # -----------------------------------------------------------
+    # LOOKUP: first tower overlapping an alien's rect in its lane
+    # -----------------------------------------------------------
+    def find_blocking(self, row, x, y, width, height):
+        # Only the (at most two) cells the rect's x range covers are
+        # checked. Blue wins over black. Returns a cell or None.
+        if not self.occupied:
+            return None
+        layout = self.layout
+        first = int((x - layout.grid_origin_x) // layout.cell_width)
+        last = int((x + width - layout.grid_origin_x) // layout.cell_width)
+        first, last = max(first, 0), min(last, self.num_columns - 1)
+
+        found = None
+        base = row * self.num_columns
+        for col in range(first, last + 1):
+            cell = base + col
+            tower_type = self.types[cell]
+            if tower_type == TOWER_EMPTY:
+                continue
+            px, py = self.position(cell)
+            if y < py + self.tower_height and y + height > py and x < px + self.tower_width and x + width > px:
+                if tower_type == TOWER_BLUE:
+                    return cell
+                if found is None:
+                    found = cell
+        return found
+
+    # -----------------------------------------------------------
+    # TOWER ACTIONS: black towers spawn balls, blue towers shoot
+    # cells are the towers whose timers came due this tick; towers
+    # of the other type, or destroyed since, are skipped
+    # -----------------------------------------------------------
+    def spawn_balls(self, cells, balls, now):
+        types, timers = self.types, self.timers
+        for cell in cells:
+            if types[cell] == TOWER_BLACK:
+                timers.schedule(cell, now + self.ball_interval)
+                px, py = self.position(cell)
+                ball = self.pools.balls.acquire(self.rng, self.layout.board_width, self.layout.board_height)
+                ball.handle = self.allocator.new()
+                ball.x = ball.prev_x = px + self.tower_width // 2
+                ball.y = ball.prev_y = py + self.tower_height // 2
+                if __debug__ and event_log.debug_enabled:
+                    event_log.debug("spawn", "black item mineral spawned", sim_time=now, x=px, y=py)
+                balls.append(ball)
+
+    def shoot_lasers(self, cells, lasers, now):
+        types, timers = self.types, self.timers
+        for cell in cells:
+            if types[cell] == TOWER_BLUE:
+                timers.schedule(cell, now + self.shoot_interval)
+                px, py = self.position(cell)
+                row = cell // self.num_columns
+                laser = self.pools.lasers.acquire(px + self.tower_width, py + self.tower_height // 2 - 2.5, row)
+                laser.handle = self.allocator.new()
+                lasers.append(laser)
+
+    def draw_list(self):
+        # [(x, y, type, health)] of every tower, for draw_towers
+        types, health, position = self.types, self.health, self.position
+        return [(*position(cell), types[cell], health[cell]) for cell in self.occupied]
+
+
+# -----------------------------------------------------------
+# FUNCTION: draw_towers
+# Draws towers given as (x, y, type, health) tuples, with a
+# health bar on damaged ones unless health_bars is False.
+# Positions and sizes are multiplied by scale, then positions
+# shifted by offset. Returns the list of screen areas that were
+# drawn to.
+# -----------------------------------------------------------
+def draw_towers(surface, towers, tower_width, tower_height, scale=1.0, health_bars=True, offset=(0, 0)):
+    rects = []
+    tower_surfaces = {tower_type: sprite_cache.rect(tower_width * scale, tower_height * scale, color)
+                      for tower_type, color in TOWER_COLORS.items()}
+    ox, oy = offset
+    for px, py, tower_type, health in towers:
+        px, py = px * scale + ox, py * scale + oy
+        rects.append(surface.blit(tower_surfaces[tower_type], (px, py)))
+        # Draw health bar
+        if health < 4 and health_bars:
+            bar_width = int(tower_width * (health / 4) * scale)
+            rects.append(pygame.draw.rect(surface, (255, 0, 0), (px, py - 8 * scale, bar_width, 5 * scale)))
+    return rects